@@ -72,6 +72,7 @@ class _RecommendationScreenState extends State<RecommendationScreen> {
         Uri.parse(Config.recommend),
         headers: {'Content-Type': 'application/json'},
         body: jsonEncode({
+          "email": email,
           "liked_articles": topLiked
               .map((article) => {
                     "title": article["title"]?.toString() ?? "",
@@ -1,15 +1,4 @@
 # app/__init__.py
-from fastapi import FastAPI
-from .config.db import db
-
-app = FastAPI()
-
-@app.on_event("startup")
-async def startup():
-    print("Connecting to MongoDB...")
-    if db.command("ping"):
-        print("MongoDB connected successfully.")
-
-@app.on_event("shutdown")
-async def shutdown():
-    print("Closing MongoDB connection...")
\ No newline at end of file
+# The FastAPI application and its startup/shutdown hooks live in app.main
+# (run with `uvicorn app.main:app`). This package must stay import-free:
+# spawned scoring workers import it without wanting a second app or a DB client.
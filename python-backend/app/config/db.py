@@ -1,26 +1,245 @@
 # app/config/db.py
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, monitoring
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
 client = None
 db = None
+# Registration relies on the unique users indexes to reject duplicates; until one exists
+# (see missing_unique_fields) UserModel.create_user looks duplicates up itself
+UNIQUE_USER_FIELDS = ("email", "username", "phone")
+unique_user_fields = set()
+indexes_ready = False
+index_error = None
+_index_task = None
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool counters and checkout wait times, fed by the driver's pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+        self._local = threading.local()
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def connection_check_out_started(self, event):
+        # Checked-out events only carry a duration from pymongo 4.7 on; a checkout starts and
+        # ends on the same driver thread, so time it from here instead
+        self._local.started = time.perf_counter()
+
+    def _wait(self):
+        started, self._local.started = getattr(self._local, "started", None), None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_checked_out(self, event):
+        wait = self._wait()
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.wait_last = wait
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_check_out_failed(self, event):
+        self._wait()
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "open_connections": self.created - self.closed,
+                "in_use": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_avg_ms": 1000 * self.wait_total / self.checkouts if self.checkouts else 0.0,
+                "checkout_wait_max_ms": 1000 * self.wait_max,
+                "checkout_wait_last_ms": 1000 * self.wait_last,
+            }
+
+
+pool_monitor = PoolMonitor()
+
 
 async def connect_to_mongo():
-    global client, db
-    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
-    db = client["test"]  # Replace "test" with your actual database name
-    print("MongoDB connected successfully.")
+    global client, db, _index_task
+    client = AsyncIOMotorClient(
+        os.getenv("MONGO_URI"),
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+        maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_MS", "300000")),
+        connectTimeoutMS=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        socketTimeoutMS=int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000")),
+        waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+        event_listeners=[pool_monitor],
+    )
+    db = client[os.getenv("MONGO_DB_NAME", "test")]
+    try:
+        await warm_up(int(os.getenv("MONGO_WARMUP_CONNECTIONS", os.getenv("MONGO_MIN_POOL_SIZE", "10"))))
+        logger.info("MongoDB connected")
+        connected = True
+    except Exception as e:
+        # Keep starting; /ops/ready reports the database as unavailable until it answers
+        logger.warning(f"MongoDB is not reachable yet: {e}")
+        connected = False
+    if not connected or not await ensure_indexes():
+        _index_task = asyncio.ensure_future(retry_indexes())
+
+async def retry_indexes():
+    """Retry ensure_indexes with backoff until every index exists."""
+    delay = float(os.getenv("MONGO_INDEX_RETRY_S", "5"))
+    while True:
+        await asyncio.sleep(delay)
+        if await ensure_indexes():
+            logger.info("MongoDB indexes created")
+            return
+        delay = min(delay * 2, 300)
+
+async def warm_up(connections):
+    """Open connections up front with concurrent pings, so early requests skip the handshake."""
+    await asyncio.gather(*(db.command("ping") for _ in range(max(connections, 1))))
+
+async def ping():
+    """Round-trip time of a ping in milliseconds; raises if the server is unreachable."""
+    start = time.perf_counter()
+    await get_db().command("ping")
+    return (time.perf_counter() - start) * 1000
+
+async def ensure_indexes():
+    """Create the indexes the app relies on. Returns True once all of them exist."""
+    global indexes_ready, index_error
+    errors = []
+    # Unique indexes make registration a single insert and close the check-then-insert race
+    for field in UNIQUE_USER_FIELDS:
+        try:
+            await db["users"].create_index([(field, ASCENDING)], unique=True, name=f"{field}_1")
+            unique_user_fields.add(field)
+        except Exception as e:
+            # Existing duplicates or an unreachable server; registration falls back to looking
+            # duplicates up first, which is racy but keeps the service up
+            logger.warning(f"Could not create unique index on users.{field}: {e}")
+            errors.append(f"users.{field}: {e}")
+            if getattr(e, "code", None) == 11000:
+                await log_duplicates(field)
+    # Likes: recent-N per user, and one like per (user, title)
+    try:
+        # title breaks likedAt ties, so cursor pages can be read straight off the index
+        await db["likes"].create_index([("user", ASCENDING), ("likedAt", DESCENDING), ("title", DESCENDING)])
+        await db["likes"].create_index([("user", ASCENDING), ("title", ASCENDING)], unique=True)
+    except Exception as e:
+        logger.warning(f"Could not create likes indexes: {e}")
+        errors.append(f"likes: {e}")
+    index_error = "; ".join(errors) or None
+    indexes_ready = not errors
+    return indexes_ready
+
+async def log_duplicates(field, limit=20):
+    """Log the users.field values held by more than one user, which block its unique index."""
+    try:
+        pipeline = [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$sort": {"count": -1}},
+            {"$limit": limit},
+        ]
+        duplicates = await db["users"].aggregate(pipeline).to_list(length=limit)
+    except Exception as e:
+        logger.warning(f"Could not list duplicate users.{field} values: {e}")
+        return
+    logger.warning(
+        f"Duplicate users.{field} values block its unique index; remove them to enable it",
+        extra={"field": field, "duplicates": {str(d["_id"]): d["count"] for d in duplicates}},
+    )
+
+def index_status():
+    return {"ready": indexes_ready, "error": index_error, "missing_unique_fields": missing_unique_fields()}
+
+def missing_unique_fields():
+    """Users fields whose unique index doesn't exist (yet), in UNIQUE_USER_FIELDS order."""
+    return [field for field in UNIQUE_USER_FIELDS if field not in unique_user_fields]
+
+async def run_migration(name, migrate, stale_after=timedelta(minutes=30)):
+    """
+    Run migrate() once per database instead of on every worker start. A marker in the
+    migrations collection is claimed first, so other workers skip it while it runs and
+    nobody repeats it once done; a claim left by a worker that died mid-run expires after
+    stale_after. Returns what migrate() returned, or None if it was skipped.
+    """
+    migrations = get_db()["migrations"]
+    started = datetime.utcnow()
+    try:
+        # Matches only an expired claim; otherwise the upsert collides with the existing marker
+        await migrations.update_one(
+            {"_id": name, "doneAt": None, "startedAt": {"$lt": started - stale_after}},
+            {"$set": {"startedAt": started}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return None
+    try:
+        result = await migrate()
+    except BaseException:
+        await migrations.delete_one({"_id": name, "startedAt": started})
+        raise
+    await migrations.update_one({"_id": name}, {"$set": {"doneAt": datetime.utcnow()}})
+    logger.info(f"Migration {name} done")
+    return result
 
 async def close_mongo_connection():
     global client
+    if _index_task is not None and not _index_task.done():
+        _index_task.cancel()
     if client:
         client.close()
-        print("MongoDB connection closed.")
+        logger.info("MongoDB connection closed")
 
 def get_db():
     if db is None:
         raise ValueError("Database not initialized")
-    return db
\ No newline at end of file
+    return db
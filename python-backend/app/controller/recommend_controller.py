@@ -1,27 +1,83 @@
 from fastapi import HTTPException
-from typing import List
+from typing import List, Optional
+from app.models.user_model import UserModel
+from app.utils.executor import ExecutorBusy
+from app.utils.result_cache import get_cached_recommendations, cache_recommendations
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+RECENT_LIKES = 10  # liked articles a recommendation is based on
+
 class RecommendController:
     def __init__(self, service):
         self.service = service
         logger.info("RecommendController initialized")
     
-    async def recommend_articles(self, liked_articles: List[dict]):
+    async def recommend_articles(self, liked_articles: List[dict], email: Optional[str] = None):
         try:
             if not liked_articles:
                 raise HTTPException(status_code=400, detail="No liked articles provided")
             logger.info(f"Processing {len(liked_articles)} most recent liked articles: {[art['title'] for art in liked_articles]}")
             self._validate_input(liked_articles)
-            return self.service.get_recommendations(liked_articles)
+            if email:
+                cached = get_cached_recommendations(email, liked_articles)
+                if cached is not None:
+                    logger.info(f"Serving cached recommendations for {email}")
+                    return cached
+            recommendations = None
+            if email:
+                recommendations = await self.service.get_profile_recommendations(email, liked_articles)
+            if recommendations is None:
+                recommendations = await self.service.get_recommendations(liked_articles)
+            # Empty results may come from a failed fetch; don't pin them for the TTL
+            if email and recommendations:
+                cache_recommendations(email, liked_articles, recommendations)
+            return recommendations
         except HTTPException as e:
             raise
+        except ExecutorBusy as e:
+            logger.warning(f"Rejecting recommendation request: {e}")
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
         except Exception as e:
             logger.error(f"Recommendation failed: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to generate recommendations")
     
+    async def stream_articles(self, liked_articles: List[dict]):
+        """Validate up front, then return an async generator of NDJSON lines."""
+        if not liked_articles:
+            raise HTTPException(status_code=400, detail="No liked articles provided")
+        self._validate_input(liked_articles)
+        return self._ndjson(liked_articles)
+
+    async def _ndjson(self, liked_articles: List[dict]):
+        count = 0
+        try:
+            async for batch in self.service.stream_recommendations(liked_articles):
+                count += len(batch["articles"])
+                yield json.dumps({"type": "recommendations", **batch}) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            logger.error(f"Streaming recommendations failed: {str(e)}", exc_info=True)
+            yield json.dumps({"type": "error", "detail": "Failed to generate recommendations"}) + "\n"
+            return
+        yield json.dumps({"type": "done", "count": count}) + "\n"
+
+    async def recent_liked_articles(self, liked_articles, email: Optional[str] = None, limit: int = RECENT_LIKES):
+        """
+        The newest liked articles, newest first: the tail of the posted list, or, if none
+        was posted, the user's most recent likes straight from the (user, likedAt) index.
+        """
+        if liked_articles:
+            return [article.dict() for article in reversed(liked_articles[-limit:])]
+        if email:
+            return [
+                {"title": like["title"], "category": like.get("category", "general")}
+                for like in await UserModel.get_recent_likes(email, limit)
+            ]
+        return []
+
     def _validate_input(self, liked_articles: List[dict]):
         for art in liked_articles:
             if not isinstance(art, dict):
@@ -3,7 +3,11 @@ from datetime import timedelta
 from fastapi import HTTPException, status
 from app.services.user_services import UserServices
 from app.utils.auth import generate_token  # Add this import
-import bcrypt  # Ensure bcrypt is also imported
+from app.utils.executor import ExecutorBusy
+from app.utils.passwords import verify_password
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class UserController:
@@ -29,7 +33,7 @@ class UserController:
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
@@ -53,13 +57,14 @@ class UserController:
                     detail="User does not exist."
                 )
 
-            # Verify password
-            is_valid = bcrypt.checkpw(password.encode(), user["password"])
+            # Verify password (on the bcrypt pool, not the event loop)
+            is_valid = await verify_password(password, user["password"])
             if not is_valid:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid credentials."
                 )
+            await UserServices.rehash_password_if_needed(user, password)
 
             # Generate token
             token_data = {"_id": str(user["_id"]), "email": user["email"]}
@@ -70,8 +75,13 @@ class UserController:
 
         except HTTPException as e:
             raise e
+        except ExecutorBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry."
+            )
         except Exception as e:
-            print(f"Unexpected error during login: {e}")
+            logger.error(f"Unexpected error during login: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error."
@@ -85,7 +95,7 @@ class UserController:
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
@@ -99,7 +109,7 @@ class UserController:
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Internal server error"
@@ -114,7 +124,7 @@ class UserController:
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Internal server error")
 
@@ -128,5 +138,27 @@ class UserController:
             # Propagate the error properly
             raise e
         except Exception as e:
-            print(f"Controller error: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+            logger.error(f"Controller error: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    @staticmethod
+    async def get_liked_page(email: str, limit: int, before: str = None, after: str = None):
+        try:
+            if before and after:
+                raise HTTPException(status_code=400, detail="Pass either before or after, not both")
+            return await UserServices.get_liked_page(email, limit, before=before, after=after)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            logger.error(f"Controller error: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+
+    @staticmethod
+    async def count_liked_articles(email: str):
+        try:
+            return await UserServices.count_liked_articles(email)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            logger.error(f"Controller error: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,20 +1,35 @@
+# Time every import from here on; the breakdown is served at /ops/startup
+from app.utils.startup import startup_state
+startup_state.imports.install()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.user_router import router as user_router
 from app.routes.recommend_router import router as recommend_router
-from app.config.db import connect_to_mongo, close_mongo_connection
+from app.routes.ops_router import router as ops_router
+from app.routes.metrics_router import router as metrics_router
+from app.config.db import connect_to_mongo, close_mongo_connection, run_migration
+from app.models.user_model import UserModel
+from app.services.ingestion_service import IngestionService
+from app.services.recommend_service import load_recommendation_service, peek_recommendation_service
+from app.utils.executor import loop_monitor
+from app.utils.http_client import close_http_client
+from app.utils.log import RouteContextMiddleware, configure_logging, stop_logging
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
+import asyncio
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log")
-    ]
-)
+# JSON lines, written by a background thread (see app/utils/log.py)
+configure_logging()
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
+# Built by the warm-up, together with the recommendation service it feeds
+ingestion = None
+warm_up_task = None
+migration_task = None
 
 # CORS Configuration (Simplified)
 app.add_middleware(
@@ -24,14 +39,79 @@ app.add_middleware(
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
 )
+app.add_middleware(RouteContextMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so profiles and Server-Timing cover the other middleware too
+app.add_middleware(ProfilingMiddleware)
+
+startup_state.mark("import")
 
 @app.on_event("startup")
 async def startup():
-    await connect_to_mongo()
+    global warm_up_task, migration_task
+    loop_monitor.start()
+    with startup_state.phase("mongo"):
+        await connect_to_mongo()
+    migration_task = asyncio.ensure_future(migrate_liked_articles())
+    migration_task.add_done_callback(log_task_failure)
+    # Everything else happens after the server binds its port: /login and the other
+    # MongoDB-only routes serve right away, /ops/ready reports 503 until warm_up is done
+    warm_up_task = asyncio.ensure_future(warm_up())
+
+async def warm_up():
+    """Build the recommendation service off the event loop, start ingestion and the scoring workers."""
+    global ingestion
+    try:
+        with startup_state.phase("recommendation_service"):
+            service = await load_recommendation_service()
+        ingestion = IngestionService(service)
+        with startup_state.phase("ingestion"):
+            await ingestion.start()
+        with startup_state.phase("scoring_workers"):
+            await service.executor.warm_up()
+        startup_state.mark_ready()
+        report = startup_state.report(top=5)
+        logger.info(
+            f"Ready after {report['ready_after_ms']:.0f} ms",
+            extra={"phases_ms": report["phases_ms"], "imports": report["imports"]},
+        )
+    except Exception as e:
+        startup_state.error = repr(e)
+        logger.error(f"Warm-up failed: {e!r}", exc_info=True)
+
+def log_task_failure(task):
+    """Done-callback for background tasks: report a crash instead of leaving it unretrieved."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task failed: {task.exception()!r}", exc_info=task.exception())
+
+async def migrate_liked_articles():
+    try:
+        # Once per database: the scan for embedded arrays is unindexed, and workers would race on it
+        migrated = await run_migration("liked_articles_to_likes", UserModel.migrate_liked_articles)
+        if migrated:
+            logger.info(f"Moved embedded likes of {migrated} users to the likes collection")
+    except Exception as e:
+        logger.error(f"Like migration failed: {e!r}")
 
 @app.on_event("shutdown")
 async def shutdown():
+    for task in (warm_up_task, migration_task):
+        if task is not None and not task.done():
+            task.cancel()
+    if migration_task is not None:
+        # A cancelled run releases its migration claim (see run_migration) before we disconnect
+        await asyncio.gather(migration_task, return_exceptions=True)
+    if ingestion is not None:
+        await ingestion.stop()
+    service = peek_recommendation_service()
+    if service is not None:
+        service.executor.shutdown()
+    await loop_monitor.stop()
+    await close_http_client()
     await close_mongo_connection()
+    stop_logging()
 
 app.include_router(user_router)
-app.include_router(recommend_router)
\ No newline at end of file
+app.include_router(recommend_router)
+app.include_router(ops_router)
+app.include_router(metrics_router)
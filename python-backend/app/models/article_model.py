@@ -0,0 +1,57 @@
+# app/models/article_model.py
+from app.config.db import get_db
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleModel:
+    @staticmethod
+    def get_collection():
+        db = get_db()
+        return db["articles"]
+
+    @staticmethod
+    async def ensure_indexes():
+        try:
+            collection = ArticleModel.get_collection()
+            await collection.create_index([("url", ASCENDING)], unique=True)
+            await collection.create_index([("publishedAt", DESCENDING)])
+        except Exception as e:
+            logger.error(f"Error creating article indexes: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def upsert_articles(articles):
+        """
+        Insert articles that are not stored yet (deduped by url). Returns the number inserted.
+        vectorId and vectorStore are always updated, so previously stored articles point at their current vector.
+        """
+        if not articles:
+            return 0
+        try:
+            collection = ArticleModel.get_collection()
+            requests = []
+            for article in articles:
+                fields = {k: v for k, v in article.items() if k not in ("vectorId", "vectorStore")}
+                update = {"$setOnInsert": fields}
+                if article.get("vectorId") is not None:
+                    update["$set"] = {"vectorId": article["vectorId"], "vectorStore": article.get("vectorStore")}
+                requests.append(UpdateOne({"url": article["url"]}, update, upsert=True))
+            result = await collection.bulk_write(requests, ordered=False)
+            return result.upserted_count
+        except Exception as e:
+            logger.error(f"Error storing articles: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def find_recent(limit):
+        try:
+            collection = ArticleModel.get_collection()
+            cursor = collection.find({}, {"_id": 0}).sort("publishedAt", DESCENDING).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            logger.error(f"Error loading articles: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
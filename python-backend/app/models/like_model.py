@@ -0,0 +1,173 @@
+# app/models/like_model.py
+from app.config.db import get_db
+import base64
+import json
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+import logging
+
+logger = logging.getLogger(__name__)
+
+LIKE_FIELDS = {"_id": 0, "title": 1, "category": 1, "likedAt": 1}
+NEWEST_FIRST = [("likedAt", DESCENDING), ("title", DESCENDING)]
+OLDEST_FIRST = [("likedAt", ASCENDING), ("title", ASCENDING)]
+
+
+class LikeModel:
+    """
+    One document per (user, title) like: {"user": email, "title", "category", "likedAt"},
+    plus "vector", the title vector the like added to the user's interest profile.
+    Indexed on (user, likedAt) for recency queries and unique on (user, title) (see
+    connect_to_mongo), so liking and unliking are single idempotent writes.
+    """
+
+    @staticmethod
+    def get_collection():
+        db = get_db()
+        return db["likes"]
+
+    @staticmethod
+    async def like(email, title, category, vector=None):
+        """Record a like. Returns the like document if it is new, or None if it already existed."""
+        try:
+            collection = LikeModel.get_collection()
+            like = {"title": title, "category": category, "likedAt": datetime.utcnow()}
+            fields = {"category": category, "likedAt": like["likedAt"]}
+            if vector is not None:
+                fields["vector"] = vector
+            result = await collection.update_one({"user": email, "title": title}, {"$setOnInsert": fields}, upsert=True)
+            # An existing like is left untouched, keeping its original likedAt
+            return like if result.upserted_id is not None else None
+        except DuplicateKeyError:
+            # A concurrent like of the same title won the upsert
+            return None
+        except Exception as e:
+            logger.error(f"Error liking article: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def unlike(email, title):
+        """Remove a like. Returns the removed like, with its vector, or None if there was none."""
+        try:
+            collection = LikeModel.get_collection()
+            return await collection.find_one_and_delete(
+                {"user": email, "title": title}, projection={**LIKE_FIELDS, "vector": 1}
+            )
+        except Exception as e:
+            logger.error(f"Error unliking article: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def find_recent(email, limit):
+        """The user's limit most recent likes, newest first."""
+        try:
+            collection = LikeModel.get_collection()
+            cursor = collection.find({"user": email}, LIKE_FIELDS).sort(NEWEST_FIRST).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            logger.error(f"Error loading likes: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def find_all(email, with_vectors=False):
+        """Every like of the user, oldest first (the order likedArticles used to have)."""
+        try:
+            collection = LikeModel.get_collection()
+            fields = {**LIKE_FIELDS, "vector": 1} if with_vectors else LIKE_FIELDS
+            cursor = collection.find({"user": email}, fields).sort(OLDEST_FIRST)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error loading likes: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def find_page(email, limit, before=None, after=None):
+        """
+        Up to limit likes, oldest first, strictly before or after a cursor (see encode_cursor);
+        without a cursor, the newest ones. Returns (likes, has_more).
+        """
+        try:
+            collection = LikeModel.get_collection()
+            query = {"user": email}
+            if after:
+                # Forwards from the cursor
+                liked_at, title = LikeModel.decode_cursor(after)
+                query["$or"] = [{"likedAt": {"$gt": liked_at}}, {"likedAt": liked_at, "title": {"$gt": title}}]
+                order = OLDEST_FIRST
+            else:
+                # Backwards from the cursor (or the newest like), flipped below
+                if before:
+                    liked_at, title = LikeModel.decode_cursor(before)
+                    query["$or"] = [{"likedAt": {"$lt": liked_at}}, {"likedAt": liked_at, "title": {"$lt": title}}]
+                order = NEWEST_FIRST
+            # One extra document tells whether another page follows
+            cursor = collection.find(query, LIKE_FIELDS).sort(order).limit(limit + 1)
+            likes = await cursor.to_list(length=limit + 1)
+            has_more = len(likes) > limit
+            likes = likes[:limit]
+            if not after:
+                likes.reverse()
+            return likes, has_more
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error loading likes: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    async def count(email):
+        try:
+            collection = LikeModel.get_collection()
+            return await collection.count_documents({"user": email})
+        except Exception as e:
+            logger.error(f"Error counting likes: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    def encode_cursor(like):
+        """Opaque page cursor for a like: its (likedAt, title) position."""
+        raw = json.dumps([like["likedAt"].isoformat(), like["title"]])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            liked_at, title = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(liked_at), title
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @staticmethod
+    async def migrate_embedded(users):
+        """
+        Move likes from the legacy embedded users.likedArticles arrays into this collection,
+        then drop the arrays. Safe to re-run: existing likes are left as they are.
+        """
+        migrated = 0
+        try:
+            cursor = users.find({"likedArticles.0": {"$exists": True}}, {"email": 1, "likedArticles": 1})
+            async for user in cursor:
+                requests = []
+                # Likes from before likedAt existed keep their array order, spaced 1ms apart
+                created = user["_id"].generation_time.replace(tzinfo=None)
+                for i, article in enumerate(user["likedArticles"]):
+                    if not article.get("title"):
+                        continue
+                    requests.append(UpdateOne(
+                        {"user": user["email"], "title": article["title"]},
+                        {"$setOnInsert": {
+                            "category": article.get("category", "general"),
+                            "likedAt": article.get("likedAt") or created + timedelta(milliseconds=i),
+                        }},
+                        upsert=True,
+                    ))
+                if requests:
+                    await LikeModel.get_collection().bulk_write(requests, ordered=False)
+                await users.update_one({"_id": user["_id"]}, {"$unset": {"likedArticles": ""}})
+                migrated += 1
+            return migrated
+        except Exception as e:
+            logger.error(f"Error migrating embedded likes: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
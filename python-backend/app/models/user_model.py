@@ -1,8 +1,20 @@
 # app/models/user_model.py
-from app.config.db import get_db  # Import the get_db function
+from app.config.db import get_db, missing_unique_fields  # Import the get_db function
+from app.models.like_model import LikeModel
 from bson.objectid import ObjectId
-import bcrypt
+from app.utils.passwords import hash_password
 from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from app.utils.metrics import mongo_operations
+from app.utils.result_cache import invalidate_user
+from app.utils.user_cache import user_cache
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Never cached or returned by get_user_profile
+PRIVATE_FIELDS = {"password": 0, "interest": 0, "likedArticles": 0}
 
 class UserModel:
     @staticmethod
@@ -12,23 +24,61 @@ class UserModel:
 
     @staticmethod
     async def create_user(email, password, username, phone):
+        # Hashed on the bcrypt pool so the event loop keeps serving; ExecutorBusy propagates
+        hashed_password = await hash_password(password)  # Returns bytes
         try:
-            # Hash the password (ensure it's bytes)
-            hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt())  # Returns bytes
             user_data = {
                 "email": email,
                 "password": hashed_password,  # Stored as bytes
                 "username": username,
-                "phone": phone,
-                "likedArticles": []
+                "phone": phone
             }
             collection = UserModel.get_collection()
-            result = await collection.insert_one(user_data)
-            print(f"DEBUG: User inserted with ID: {result.inserted_id}")  # Debug log
+            # Timed here rather than with the decorator, which would include the hashing
+            start = time.perf_counter()
+            try:
+                missing = missing_unique_fields()
+                if missing:
+                    # No unique index to reject these yet (see ensure_indexes): check first, racy as that is
+                    existing = await collection.find_one(
+                        {"$or": [{field: user_data[field]} for field in missing]}, {"_id": 0, **{f: 1 for f in missing}}
+                    )
+                    if existing is not None:
+                        field = next(f for f in missing if existing.get(f) == user_data[f])
+                        raise HTTPException(status_code=400, detail=UserModel.DUPLICATE_MESSAGES[field])
+                result = await collection.insert_one(user_data)
+            finally:
+                mongo_operations.labels("UserModel", "create_user").observe(time.perf_counter() - start)
+            logger.debug(f"User inserted with ID: {result.inserted_id}")
+            user_cache.invalidate(email)
             return result
+        except DuplicateKeyError as e:
+            raise HTTPException(status_code=400, detail=UserModel.duplicate_message(e))
+        except HTTPException:
+            raise
         except Exception as e:
-            print(f"Error creating user: {e}")
+            logger.error(f"Error creating user: {e}")
             raise HTTPException(status_code=500, detail="Failed to create user")
+
+
+    DUPLICATE_MESSAGES = {
+        "email": "Email already registered",
+        "username": "Username already taken",
+        "phone": "Phone number already registered",
+    }
+
+    @staticmethod
+    def duplicate_message(error):
+        """Map a DuplicateKeyError from the unique users indexes to the registration error message."""
+        details = error.details or {}
+        fields = list(details.get("keyPattern") or details.get("keyValue") or [])
+        if not fields:
+            # Older servers only name the index in the message, e.g. "index: email_1"
+            fields = [f for f in UserModel.DUPLICATE_MESSAGES if f"{f}_1" in str(error)]
+        for field in fields:
+            if field in UserModel.DUPLICATE_MESSAGES:
+                return UserModel.DUPLICATE_MESSAGES[field]
+        return "User already exists"
           
     # @staticmethod
     # async def find_user_by_email(email):
@@ -62,63 +112,156 @@ class UserModel:
 
     # Updated find_user_by_email
     @staticmethod
+    @mongo_operations.time("UserModel", "find_user_by_email")
     async def find_user_by_email(email):
         try:
             collection = UserModel.get_collection()
             return await collection.find_one({"email": email})  # Returns None if not found
         except Exception as e:
-            print(f"Error finding user by email: {e}")
+            logger.error(f"Error finding user by email: {e}")
             raise HTTPException(status_code=500, detail="Database error")
 
     # Similarly update these methods:
     @staticmethod
+    @mongo_operations.time("UserModel", "find_user_by_username")
     async def find_user_by_username(username):
         try:
             collection = UserModel.get_collection()
             return await collection.find_one({"username": username})
         except Exception as e:
-            print(f"Error finding user by username: {e}")
+            logger.error(f"Error finding user by username: {e}")
             raise HTTPException(status_code=500, detail="Database error")
 
     @staticmethod
+    @mongo_operations.time("UserModel", "find_user_by_phone")
     async def find_user_by_phone(phone):
         try:
             collection = UserModel.get_collection()
             return await collection.find_one({"phone": phone})
         except Exception as e:
-            print(f"Error finding user by phone: {e}")
+            logger.error(f"Error finding user by phone: {e}")
             raise HTTPException(status_code=500, detail="Database error")
         
+    # Not timed: cache hits aren't MongoDB operations; _load_profile times the misses
+    @staticmethod
+    async def get_user_profile(email):
+        """
+        The user record without password or other private fields, served from the
+        in-process user cache when possible. Returns a copy, or None if there is no such user.
+        """
+        user = user_cache.get(email)
+        if user is None:
+            user = await UserModel._load_profile(email)
+            if user is None:
+                return None
+            user_cache.set(email, user)
+        return dict(user)
+
     @staticmethod
-    async def like_article(email, article_title, article_category):
+    @mongo_operations.time("UserModel", "get_user_profile")
+    async def _load_profile(email):
         try:
             collection = UserModel.get_collection()
-            user = await UserModel.find_user_by_email(email)
-            if user:
-                # Remove ObjectId() conversion - user["_id"] is already an ObjectId
-                await collection.update_one(
-                    {"_id": user["_id"]},  # <-- FIX HERE
-                    {"$push": {"likedArticles": {"title": article_title, "category": article_category}}}
-                )
-                return True
-            raise HTTPException(status_code=404, detail="User not found")
+            return await collection.find_one({"email": email}, PRIVATE_FIELDS)
         except Exception as e:
-            print(f"Error liking article: {str(e)}")
+            logger.error(f"Error finding user by email: {e}")
             raise HTTPException(status_code=500, detail="Database error")
 
     @staticmethod
+    async def user_exists(email):
+        return await UserModel.get_user_profile(email) is not None
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "like_article")
+    async def like_article(email, article_title, article_category, vector=None):
+        """Idempotent like. Returns the new like, or None if the article was already liked."""
+        if not await UserModel.user_exists(email):
+            raise HTTPException(status_code=404, detail="User not found")
+        like = await LikeModel.like(email, article_title, article_category, vector)
+        if like is not None:
+            invalidate_user(email)
+        return like
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "unlike_article")
     async def unlike_article(email, article_title):
+        """Idempotent unlike. Returns the removed like, or None if the article was not liked."""
+        if not await UserModel.user_exists(email):
+            raise HTTPException(status_code=404, detail="User not found")
+        like = await LikeModel.unlike(email, article_title)
+        if like is not None:
+            invalidate_user(email)
+        return like
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "get_liked_articles")
+    async def get_liked_articles(email, with_vectors=False):
+        """Every liked article, oldest first; with_vectors adds each like's stored title vector."""
+        return await LikeModel.find_all(email, with_vectors)
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "get_recent_likes")
+    async def get_recent_likes(email, limit):
+        """The limit most recently liked articles, newest first."""
+        return await LikeModel.find_recent(email, limit)
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "get_liked_page")
+    async def get_liked_page(email, limit, before=None, after=None):
+        """A cursor page of liked articles, oldest first; returns (likes, has_more)."""
+        return await LikeModel.find_page(email, limit, before=before, after=after)
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "count_liked_articles")
+    async def count_liked_articles(email):
+        return await LikeModel.count(email)
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "migrate_liked_articles")
+    async def migrate_liked_articles():
+        """One-off move of embedded likedArticles arrays into the likes collection."""
+        return await LikeModel.migrate_embedded(UserModel.get_collection())
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "update_password_hash")
+    async def update_password_hash(email, hashed_password):
         try:
             collection = UserModel.get_collection()
-            user = await UserModel.find_user_by_email(email)
-            if user:
-                # Remove ObjectId() here too
-                await collection.update_one(
-                    {"_id": user["_id"]},  # <-- FIX HERE
-                    {"$pull": {"likedArticles": {"title": article_title}}}
-                )
-                return True
-            raise HTTPException(status_code=404, detail="User not found")
+            await collection.update_one({"email": email}, {"$set": {"password": hashed_password}})
+            user_cache.invalidate(email)
+        except Exception as e:
+            logger.error(f"Error updating password hash: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "get_interest")
+    async def get_interest(email):
+        """The stored interest profile ({"vector", "updatedAt"}) or None."""
+        try:
+            collection = UserModel.get_collection()
+            user = await collection.find_one({"email": email}, {"_id": 0, "interest": 1})
+            return (user or {}).get("interest")
+        except Exception as e:
+            logger.error(f"Error loading interest profile: {e}")
+            raise HTTPException(status_code=500, detail="Database error")
+
+    @staticmethod
+    @mongo_operations.time("UserModel", "update_interest")
+    async def update_interest(email, vector, updated_at, expected_updated_at=None):
+        """
+        Store the interest profile. With expected_updated_at the write only applies if the
+        profile was not changed in between; returns whether it applied.
+        """
+        try:
+            collection = UserModel.get_collection()
+            query = {"email": email}
+            if expected_updated_at is not None:
+                query["interest.updatedAt"] = expected_updated_at
+            # interest is not part of the cached profile, so the user cache stays valid
+            result = await collection.update_one(
+                query, {"$set": {"interest": {"vector": vector, "updatedAt": updated_at}}}
+            )
+            return result.matched_count > 0
         except Exception as e:
-            print(f"Error unliking article: {e}")
+            logger.error(f"Error storing interest profile: {e}")
             raise HTTPException(status_code=500, detail="Database error")
\ No newline at end of file
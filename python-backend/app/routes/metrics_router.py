@@ -0,0 +1,68 @@
+# app/routes/metrics_router.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.config.db import pool_monitor
+from app.services.recommend_service import peek_recommendation_service
+from app.utils import log
+from app.utils.executor import loop_monitor
+from app.utils.metrics import registry
+from app.utils.passwords import hash_executor
+from app.utils.result_cache import recommendation_cache
+from app.utils.user_cache import user_cache
+
+router = APIRouter()
+
+
+# The recommendation service's series appear once the warm-up has built it
+
+def _executors():
+    service = peek_recommendation_service()
+    executors = {"password_hashing": hash_executor}
+    if service is not None:
+        executors["recommend"] = service.executor
+    return executors
+
+
+def _caches():
+    service = peek_recommendation_service()
+    return (recommendation_cache, user_cache) if service is None else (service.news_cache, recommendation_cache, user_cache)
+
+
+def _executor_stat(key):
+    return lambda: [((name, executor.mode), executor.stats()[key]) for name, executor in _executors().items()]
+
+
+def _cache_stat(key):
+    return lambda: [((cache.name,), cache.stats()[key]) for cache in _caches()]
+
+
+def _pool_stat(key, scale=1):
+    return lambda: [((), pool_monitor.stats()[key] * scale)]
+
+
+# Read from the existing stats at scrape time, so none of these cost anything per request
+registry.gauge_callback("executor_pending_tasks", "Tasks queued or running", ("executor", "mode"), _executor_stat("pending"))
+registry.gauge_callback("executor_max_pending_tasks", "Pending tasks allowed before rejecting", ("executor", "mode"), _executor_stat("max_pending"))
+registry.counter_callback("executor_completed_tasks_total", "Tasks finished", ("executor", "mode"), _executor_stat("completed"))
+registry.counter_callback("executor_rejected_tasks_total", "Tasks rejected as busy", ("executor", "mode"), _executor_stat("rejected"))
+registry.counter_callback("cache_hits_total", "Fresh cache hits", ("cache",), _cache_stat("hits"))
+registry.counter_callback("cache_stale_hits_total", "Stale entries served while refreshing", ("cache",), _cache_stat("stale_hits"))
+registry.counter_callback("cache_misses_total", "Cache misses", ("cache",), _cache_stat("misses"))
+registry.counter_callback("cache_evictions_total", "Entries evicted to make room", ("cache",), _cache_stat("evictions"))
+registry.gauge_callback("cache_entries", "Entries held", ("cache",), _cache_stat("size"))
+registry.gauge_callback("cache_hit_ratio", "Hits (fresh or stale) per lookup since start", ("cache",), _cache_stat("hit_ratio"))
+registry.gauge_callback("mongo_pool_open_connections", "Open connections to MongoDB", (), _pool_stat("open_connections"))
+registry.gauge_callback("mongo_pool_in_use_connections", "Connections checked out", (), _pool_stat("in_use"))
+registry.counter_callback("mongo_pool_checkouts_total", "Connection checkouts", (), _pool_stat("checkouts"))
+registry.counter_callback("mongo_pool_checkout_failures_total", "Failed connection checkouts", (), _pool_stat("checkout_failures"))
+registry.gauge_callback("mongo_pool_checkout_wait_avg_seconds", "Average wait for a connection", (), _pool_stat("checkout_wait_avg_ms", 0.001))
+registry.gauge_callback("mongo_pool_checkout_wait_max_seconds", "Longest wait for a connection", (), _pool_stat("checkout_wait_max_ms", 0.001))
+registry.gauge_callback("event_loop_lag_seconds", "Latest event-loop lag sample", (), lambda: [((), loop_monitor.last)])
+registry.gauge_callback("event_loop_lag_max_seconds", "Largest event-loop lag since start", (), lambda: [((), loop_monitor.max)])
+registry.counter_callback("log_records_dropped_total", "Log records dropped on a full queue", (), lambda: [((), log.stats()["dropped"])])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """This worker's metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,91 @@
+# app/routes/ops_router.py
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from app.config.db import index_status, ping, pool_monitor
+from app.services.recommend_service import peek_recommendation_service
+from app.utils import log
+from app.utils.executor import loop_monitor
+from app.utils.passwords import hash_executor
+from app.utils.profiling import PROFILE_HEADER, list_profiles, profile_path, profile_summary, token_matches
+from app.utils.result_cache import recommendation_cache
+from app.utils.startup import startup_state
+from app.utils.user_cache import user_cache
+import asyncio
+
+router = APIRouter(prefix="/ops")
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness: 200 once the startup warm-up has finished and MongoDB answers a ping, with
+    its latency, the connection pool stats and which indexes are still missing. 503 otherwise.
+    """
+    try:
+        ping_ms = await ping()
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "mongo": {"error": str(e), "pool": pool_monitor.stats()}},
+        )
+    mongo = {"ping_ms": ping_ms, "pool": pool_monitor.stats(), "indexes": index_status()}
+    if not startup_state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed" if startup_state.error else "warming", "error": startup_state.error, "mongo": mongo},
+        )
+    return {"status": "ready", "mongo": mongo}
+
+
+@router.get("/startup")
+async def startup_report(top: int = 15):
+    """Startup phases, readiness and the slowest imports of this worker."""
+    return startup_state.report(top)
+
+
+@router.get("/runtime")
+async def runtime():
+    """Scoring, password-hashing and log queue depth and event-loop lag for this worker."""
+    service = peek_recommendation_service()
+    return {
+        # None until the warm-up has built the recommendation service
+        "executor": service.executor.stats() if service else None,
+        "password_hashing": hash_executor.stats(),
+        "event_loop": loop_monitor.stats(),
+        "logging": log.stats(),
+    }
+
+
+@router.get("/caches")
+async def caches():
+    """Size, hit/miss counts and hit ratio of this worker's in-process caches."""
+    service = peek_recommendation_service()
+    caches = (recommendation_cache, user_cache) if service is None else (service.news_cache, recommendation_cache, user_cache)
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def require_profile_token(request: Request):
+    """Profiles expose code paths and timings; only callers holding PROFILE_TOKEN may read them."""
+    if not token_matches(request.headers.get(PROFILE_HEADER.decode())):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+async def profiles():
+    """Saved request profiles, newest first (see ProfilingMiddleware)."""
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_profile_token)])
+async def profile(name: str, format: str = "prof", sort: str = "cumulative", limit: int = 40):
+    """A saved profile: the raw cProfile file (for snakeviz or pstats), or ?format=text for a top-N report."""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        try:
+            report = await asyncio.get_running_loop().run_in_executor(None, profile_summary, path, limit, sort)
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Unknown sort key: {sort}")
+        return PlainTextResponse(report)
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,27 +1,49 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.controller.recommend_controller import RecommendController
-from app.services.recommend_service import RecommendationService
+from app.services.recommend_service import load_recommendation_service
 import logging
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-service = RecommendationService()
-controller = RecommendController(service)
+_controller = None
+
+
+async def get_controller():
+    """The controller, built on first use so importing this router doesn't build the service."""
+    global _controller
+    if _controller is None:
+        _controller = RecommendController(await load_recommendation_service())
+    return _controller
+
 
 class ArticleSchema(BaseModel):
     title: str
     category: str = "general"
 
 class RecommendationRequest(BaseModel):
-    liked_articles: List[ArticleSchema]
+    # Oldest first; may be omitted when email is given, the newest likes are then read from the database
+    liked_articles: List[ArticleSchema] = []
+    email: Optional[str] = None  # enables the per-user result cache
 
 @router.post("/recommend")
 async def get_recommendations(request: RecommendationRequest):
     logger.debug(f"Received recommendation request: {request.dict()}")
-    articles = [article.dict() for article in request.liked_articles]
-    recent_articles = list(reversed(articles))[:10]  # Take 10 newest
+    controller = await get_controller()
+    recent_articles = await controller.recent_liked_articles(request.liked_articles, request.email)
     logger.debug(f"Passing {len(recent_articles)} most recent articles: {[art['title'] for art in recent_articles]}")
-    return await controller.recommend_articles(recent_articles)
\ No newline at end of file
+    return await controller.recommend_articles(recent_articles, email=request.email)
+
+@router.post("/recommend/stream")
+async def stream_recommendations(request: RecommendationRequest):
+    """
+    Same input as /recommend, answered as NDJSON: one {"type": "recommendations", "liked", "articles"}
+    line per liked article as soon as its candidates are scored, then {"type": "done", "count"}.
+    """
+    controller = await get_controller()
+    recent_articles = await controller.recent_liked_articles(request.liked_articles, request.email)
+    lines = await controller.stream_articles(recent_articles)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
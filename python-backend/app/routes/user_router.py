@@ -1,9 +1,12 @@
 # app/routes/user_router.py
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, conint
+from typing import List, Optional
 from app.controller.user_controller import UserController
 from fastapi import APIRouter, HTTPException, Request  # Add Request here
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -32,6 +35,11 @@ class GetUserDetailsRequest(BaseModel):
 
 class GetLikedArticlesRequest(BaseModel):
     email: str
+    # Optional paging: without limit every like is returned, as before
+    limit: Optional[conint(ge=1, le=100)] = None
+    before: Optional[str] = None  # cursor from a previous page: older likes
+    after: Optional[str] = None  # cursor from a previous page: newer likes
+    countOnly: bool = False
 
 
 @router.post("/registration")
@@ -43,7 +51,7 @@ async def register(request: RegisterRequest):
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Unexpected error during registration: {e}")
+        logger.error(f"Unexpected error during registration: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/login")
@@ -64,7 +72,7 @@ async def login(request: Request):
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Unexpected error during login: {e}")
+        logger.error(f"Unexpected error during login: {e}")
         raise HTTPException(
             status_code=500,
             detail="Internal server error"
@@ -82,7 +90,7 @@ async def like_article(request: LikeArticleRequest):
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Unexpected error while liking article: {e}")
+        logger.error(f"Unexpected error while liking article: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/unlikeArticle")
@@ -96,7 +104,7 @@ async def unlike_article(request: UnlikeArticleRequest):
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Unexpected error while unliking article: {e}")
+        logger.error(f"Unexpected error while unliking article: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/getUserDetails")
@@ -107,7 +115,7 @@ async def get_user_details(request: GetUserDetailsRequest):
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Unexpected error while fetching user details: {e}")
+        logger.error(f"Unexpected error while fetching user details: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
     
 # app/routes/user_router.py
@@ -115,12 +123,22 @@ async def get_user_details(request: GetUserDetailsRequest):
 @router.post("/getLikedArticles")
 async def get_liked_articles(request: GetLikedArticlesRequest):
     try:
-        print(f"\n📥 [REQUEST] Received getLikedArticles request for email: {request.email}")
-        
+        logger.debug("getLikedArticles request", extra={"email": request.email})
+
+        if request.countOnly:
+            count = await UserController.count_liked_articles(request.email)
+            return {"status": True, "data": {"count": count}}
+        if request.limit is not None:
+            page = await UserController.get_liked_page(
+                request.email, request.limit, before=request.before, after=request.after
+            )
+            logger.debug("Sending liked articles page", extra={"count": len(page["likedArticles"])})
+            return {"status": True, "data": page}
+
         # Get raw array from controller
         liked_articles = await UserController.get_liked_articles(request.email)
         
-        print(f"📤 [RESPONSE] Sending {len(liked_articles)} liked articles back to client")
+        logger.debug("Sending liked articles", extra={"count": len(liked_articles)})
         
         return {
             "status": True,
@@ -129,14 +147,14 @@ async def get_liked_articles(request: GetLikedArticlesRequest):
             }
         }
     except HTTPException as e:
-        print(f"⚠️ [ERROR] HTTPException: {e.detail}")
+        logger.warning(f"getLikedArticles failed: {e.detail}")
         return {
             "status": False,
             "error": e.detail,
             "data": {"likedArticles": []}
         }
     except Exception as e:
-        print(f"🔥 [CRITICAL] Unexpected error: {str(e)}")
+        logger.error(f"getLikedArticles failed: {e!r}")
         return {
             "status": False,
             "error": "Internal server error",
@@ -0,0 +1,129 @@
+# app/services/article_corpus.py
+from collections import OrderedDict, namedtuple
+from app.services.candidates import CandidatePool
+import numpy as np
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# pool row i is stored at vectors row offsets[i] under id doc_ids[i]; doc_ids is ascending
+CorpusSnapshot = namedtuple("CorpusSnapshot", ["pool", "doc_ids", "offsets", "vectors", "index"])
+
+
+class ArticleCorpus:
+    """
+    In-memory set of ingested articles that recommendations are scored against.
+    Articles are deduped by url and the oldest are dropped once max_size is reached.
+    Readers take an immutable snapshot, so a reindex never disturbs an in-flight request.
+
+    Article vectors (reduced TF-IDF) live in a VectorStore and are computed once, when an
+    article is first indexed; the id is kept on the article as vectorId, together with the
+    store's own id as vectorStore, so articles reloaded from MongoDB reuse their stored
+    vector as long as it comes from this store. If an ANN index is given it is kept
+    in sync on reindex: new articles are inserted, evicted ones deleted.
+    """
+
+    def __init__(self, vectorizer, store, max_size=20000, index=None):
+        self.vectorizer = vectorizer
+        self.store = store
+        self.max_size = max_size
+        self.index = index
+        self._articles = OrderedDict()  # url -> processed article
+        self._pending = []  # added since the last reindex
+        self._evicted_ids = []  # vector ids dropped since the last reindex
+        self._indexed_upto = -1  # highest id inserted into the index
+        self._lock = threading.Lock()
+        self._snapshot = CorpusSnapshot(
+            CandidatePool(), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), store.view(), index
+        )
+
+    def __len__(self):
+        return len(self._snapshot.pool)
+
+    def __contains__(self, url):
+        return url in self._articles
+
+    def add(self, articles, update_stats=True):
+        """
+        Add processed articles, skipping urls already present. Returns the newly added ones.
+        With update_stats the vectorizer's document frequencies are updated from the new articles.
+        """
+        added = []
+        with self._lock:
+            for article in articles:
+                url = article.get("url")
+                if not url or url in self._articles or not article.get("title"):
+                    continue
+                self._articles[url] = article
+                self._pending.append(article)
+                added.append(article)
+            while len(self._articles) > self.max_size:
+                evicted = self._articles.popitem(last=False)[1]
+                if self._vector_id(evicted, self.store.view()) >= 0:
+                    self._evicted_ids.append(evicted["vectorId"])
+        if update_stats and added:
+            self.vectorizer.partial_fit(a["processed_text"] for a in added)
+        return added
+
+    @staticmethod
+    def _vector_id(article, view):
+        """The article's vectorId if it was assigned by the store behind view, else -1."""
+        if article.get("vectorId") is None or view.store_id is None or article.get("vectorStore") != view.store_id:
+            return -1
+        return article["vectorId"]
+
+    def reindex(self):
+        """
+        Store vectors for new articles and swap in a new snapshot. Existing articles are
+        not re-vectorized. Returns the articles given a (new) vectorId, which callers should
+        persist. CPU-bound; run it off the event loop.
+        """
+        with self._lock:
+            articles = list(self._articles.values())
+            pending, self._pending = self._pending, []
+            evicted, self._evicted_ids = self._evicted_ids, []
+        if not articles:
+            return []
+
+        view = self.store.refresh()
+        pending = [a for a in pending if a["url"] in self._articles]
+        # An id saved against another store (say before data/ was wiped) names some other vector here
+        known = view.offsets([self._vector_id(a, view) for a in pending])
+        missing = [a for a, offset in zip(pending, known) if offset < 0]
+        if missing:
+            matrix = self.vectorizer.transform([a["processed_text"] for a in missing])
+            ids = self.store.append(self.vectorizer.reduce(matrix))
+            view = self.store.view()
+            for article, doc_id in zip(missing, ids.tolist()):
+                article["vectorId"] = doc_id
+                article["vectorStore"] = view.store_id
+
+        articles = [a for a in articles if a.get("vectorId") is not None]
+        articles.sort(key=lambda a: a["vectorId"])
+        doc_ids = np.fromiter((a["vectorId"] for a in articles), dtype=np.int64, count=len(articles))
+        if self.store.is_writer and len(view) > max(2 * len(doc_ids), 10000):
+            view = self.store.compact(doc_ids)
+        offsets = view.offsets(doc_ids)
+        if (offsets < 0).any():
+            # Vectors compacted away by another process; those articles are dropped
+            logger.warning(f"{int((offsets < 0).sum())} corpus articles have no stored vector")
+            articles = [a for a, offset in zip(articles, offsets) if offset >= 0]
+            doc_ids, offsets = doc_ids[offsets >= 0], offsets[offsets >= 0]
+        pool = CandidatePool.from_articles(articles)
+
+        if self.index is not None:
+            if evicted:
+                self.index.delete(evicted)
+            new = doc_ids > self._indexed_upto
+            if new.any():
+                self.index.insert(doc_ids[new], view.vectors[offsets[new]])
+                self._indexed_upto = int(doc_ids[new][-1])
+
+        self._snapshot = CorpusSnapshot(pool, doc_ids, offsets, view, self.index)
+        logger.info(f"Corpus reindexed with {len(pool)} articles")
+        return missing
+
+    def snapshot(self):
+        """Return the current CorpusSnapshot."""
+        return self._snapshot
@@ -0,0 +1,79 @@
+# app/services/candidates.py
+import numpy as np
+
+
+class CandidatePool:
+    """
+    Compact, column-oriented set of candidate articles. Row i of every list is the
+    same article and matches row i of the score matrix, so ranking works on NumPy
+    index arrays and response dicts are only built for the articles returned.
+    """
+
+    __slots__ = ("titles", "descriptions", "urls", "images", "sources", "published_at", "processed_text", "_title_keys")
+
+    def __init__(self):
+        self.titles = []
+        self.descriptions = []
+        self.urls = []
+        self.images = []
+        self.sources = []
+        self.published_at = []
+        self.processed_text = []
+        self._title_keys = None
+
+    def __len__(self):
+        return len(self.urls)
+
+    @classmethod
+    def from_articles(cls, articles, preprocess=None):
+        """
+        Build a pool from articles shaped like RecommendationService._process_article output.
+        Articles without a title and repeated urls are skipped. If preprocess is given it is
+        called once with every title and returns their processed_text; otherwise the
+        article's own value is used.
+        """
+        pool = cls()
+        seen = set()
+        for article in articles:
+            title = article.get("title")
+            url = article.get("url")
+            if not title or url in seen:
+                continue
+            seen.add(url)
+            pool.titles.append(title)
+            pool.descriptions.append(article.get("description", ""))
+            pool.urls.append(url)
+            pool.images.append(article.get("urlToImage", ""))
+            pool.sources.append((article.get("source") or {}).get("name", "Unknown"))
+            pool.published_at.append(article.get("publishedAt", ""))
+            if not preprocess:
+                pool.processed_text.append(article.get("processed_text", ""))
+        if preprocess:
+            pool.processed_text = preprocess(pool.titles)
+        return pool
+
+    def exclude_mask(self, titles, rows=None):
+        """
+        Boolean array marking candidates whose title matches one of titles (case-insensitive),
+        over the whole pool or only the given rows.
+        """
+        if self._title_keys is None:
+            self._title_keys = [t.strip().lower() for t in self.titles]
+        keys = {t.strip().lower() for t in titles}
+        title_keys = self._title_keys
+        if rows is None:
+            return np.fromiter((k in keys for k in title_keys), dtype=bool, count=len(title_keys))
+        return np.fromiter((title_keys[row] in keys for row in rows), dtype=bool, count=len(rows))
+
+    def record(self, row):
+        return {
+            "title": self.titles[row],
+            "description": self.descriptions[row],
+            "url": self.urls[row],
+            "urlToImage": self.images[row],
+            "source": {"name": self.sources[row]},
+            "publishedAt": self.published_at[row],
+        }
+
+    def to_records(self, rows):
+        return [self.record(row) for row in rows]
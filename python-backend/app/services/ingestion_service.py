@@ -0,0 +1,148 @@
+# app/services/ingestion_service.py
+from datetime import datetime
+from app.models.article_model import ArticleModel
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOPICS = "world,politics,business,technology,science,health,sports,entertainment"
+
+
+class IngestionService:
+    """
+    Periodically pulls fresh articles from NewsAPI into the local corpus so
+    /recommend can score without making network calls per request.
+
+    With several workers on one host only the one holding the vector store's writer
+    lock fetches from NewsAPI; the others reload the stored articles, whose vectors
+    they map from the shared store, and its saved vectorizer statistics on the same interval.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.corpus = service.corpus
+        self.enabled = os.getenv("INGEST_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("INGEST_INTERVAL", "900"))
+        self.topics = [t.strip() for t in os.getenv("INGEST_TOPICS", DEFAULT_TOPICS).split(",") if t.strip()]
+        self._task = None
+        self.is_writer = False
+
+    async def start(self):
+        if not self.enabled:
+            logger.info("Article ingestion disabled")
+            return
+        try:
+            await ArticleModel.ensure_indexes()
+            await self.load_from_store()
+        except Exception as e:
+            logger.error(f"Failed to load stored articles: {e!r}")
+        self.is_writer = self.corpus.store.acquire_writer()
+        if not self.is_writer:
+            logger.info("Another worker is ingesting; following the shared article store")
+        self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def load_from_store(self):
+        """Warm the in-memory corpus from previously ingested articles."""
+        if not self.is_writer:
+            # Follow the writer's document frequencies too, so query IDF matches the stored
+            # vectors and every worker scores a request the same way
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.corpus.vectorizer.reload, self.service.vectorizer_path)
+        stored = await ArticleModel.find_recent(self.corpus.max_size)
+        # Oldest first, so eviction order matches ingestion order. Stored articles are
+        # already counted in a persisted vectorizer; only count them on a fresh one.
+        added = self.corpus.add(reversed(stored), update_stats=self.corpus.vectorizer.n_docs == 0)
+        reassigned = await self._reindex()
+        if reassigned:
+            # Their saved vectorId was missing or from another store; without this every
+            # restart would resolve the stale ids against this store again
+            try:
+                await ArticleModel.upsert_articles(reassigned)
+            except Exception as e:
+                logger.error(f"Failed to persist vector ids of {len(reassigned)} articles: {e!r}")
+        logger.info(f"Loaded {len(added)} stored articles into the corpus")
+
+    async def _run_forever(self):
+        while True:
+            try:
+                if self.is_writer:
+                    await self.run_once()
+                else:
+                    await self.load_from_store()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        """Fetch every topic, normalize and dedupe the articles, then persist and index the new ones."""
+        pages = await asyncio.gather(*(self._fetch_topic(topic) for topic in self.topics))
+
+        batch = {}
+        for raw_articles in pages:
+            for raw in raw_articles or []:
+                article = self._normalize(raw)
+                if article is not None and article["url"] not in batch and article["url"] not in self.corpus:
+                    batch[article["url"]] = article
+
+        # Normalize every new title in one pass
+        ingested_at = datetime.utcnow()
+        processed = self.service._preprocess_batch([a["title"] for a in batch.values()])
+        for article, processed_text in zip(batch.values(), processed):
+            article["processed_text"] = processed_text
+            article["ingestedAt"] = ingested_at
+
+        added = self.corpus.add(batch.values())
+        if not added:
+            logger.info("Ingestion run found no new articles")
+            return 0
+
+        # Reindex first so the stored articles carry their vectorId
+        await self._reindex()
+        try:
+            await ArticleModel.upsert_articles(added)
+        except Exception as e:
+            # The articles remain usable in memory, they just won't survive a restart
+            logger.error(f"Failed to persist {len(added)} articles: {e!r}")
+        await self._save_vectorizer()
+        logger.info(f"Ingested {len(added)} new articles ({len(self.corpus)} in corpus)")
+        return len(added)
+
+    async def _fetch_topic(self, topic):
+        params = {
+            "q": topic,
+            "language": "en",
+            "pageSize": 100,
+            "sortBy": "publishedAt"
+        }
+        return await self.service._request_news(params)
+
+    def _normalize(self, raw):
+        article = self.service._process_article(raw)
+        title = article["title"]
+        if not title or title == "[Removed]" or article["url"] in ("", "#"):
+            return None
+        return article
+
+    async def _reindex(self):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.corpus.reindex)
+
+    async def _save_vectorizer(self):
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, self.corpus.vectorizer.save, self.service.vectorizer_path)
+        except OSError as e:
+            logger.error(f"Failed to save vectorizer to {self.service.vectorizer_path}: {e}")
@@ -0,0 +1,99 @@
+# app/services/interest_profile.py
+from datetime import datetime
+from app.models.user_model import UserModel
+from bson import Binary
+import numpy as np
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# A like counts half as much after this many days
+HALF_LIFE_SECONDS = float(os.getenv("INTEREST_HALF_LIFE_DAYS", "14")) * 86400
+
+
+class InterestProfile:
+    """
+    Per-user interest vector: the recency-weighted sum of the reduced vectors of the
+    user's liked articles, each weighted by 0.5 ** (age / half-life).
+
+    The sum is stored with the time it was last updated. Decaying it to "now" only
+    rescales it, so a like adds a vector and an unlike subtracts the decayed vector of
+    the removed like, without revisiting the other likes. The vector a like added is
+    kept on the like itself, since re-embedding the title later (after the document
+    frequencies moved) would not cancel it. Only the direction is used for scoring.
+    """
+
+    @staticmethod
+    def decay(age_seconds):
+        return 0.5 ** (max(age_seconds, 0.0) / HALF_LIFE_SECONDS)
+
+    @staticmethod
+    def decode(interest):
+        """(vector, updatedAt) from a stored interest document, or (None, None)."""
+        if not interest or interest.get("vector") is None:
+            return None, None
+        return InterestProfile.decode_vector(interest["vector"]), interest["updatedAt"]
+
+    @staticmethod
+    def decode_vector(data):
+        return None if data is None else np.frombuffer(data, dtype=np.float32)
+
+    @staticmethod
+    def encode(vector):
+        return Binary(np.asarray(vector, dtype=np.float32).tobytes())
+
+    @staticmethod
+    async def apply(email, vector, weight, liked_at=None, retries=3):
+        """
+        Add weight * vector (decayed from liked_at) to the stored profile. Returns False if
+        the user has no profile yet. Concurrent updates are detected and retried.
+        """
+        for _ in range(retries):
+            current, updated_at = InterestProfile.decode(await UserModel.get_interest(email))
+            if current is None:
+                return False
+            now = datetime.utcnow()
+            age = (now - (liked_at or now)).total_seconds()
+            current = current * InterestProfile.decay((now - updated_at).total_seconds())
+            current = current + weight * InterestProfile.decay(age) * vector
+            if await UserModel.update_interest(email, InterestProfile.encode(current), now, expected_updated_at=updated_at):
+                return True
+        logger.warning(f"Gave up updating the interest profile of {email} after {retries} conflicts")
+        return True
+
+    @staticmethod
+    async def rebuild(email, liked_articles, embed):
+        """
+        Recompute the profile from every liked article, using the vector stored on each like
+        and awaiting embed (titles to reduced vectors) for likes without one. No likes clears it.
+        """
+        liked_articles = [a for a in liked_articles if a.get("title")]
+        now = datetime.utcnow()
+        if not liked_articles:
+            await UserModel.update_interest(email, None, now)
+            return None
+        vectors = [InterestProfile.decode_vector(a.get("vector")) for a in liked_articles]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            for i, vector in zip(missing, await embed([liked_articles[i]["title"] for i in missing])):
+                vectors[i] = vector
+        vectors = np.stack(vectors)
+        weights = np.array(
+            [InterestProfile.decay((now - (a.get("likedAt") or now)).total_seconds()) for a in liked_articles],
+            dtype=np.float32,
+        )
+        profile = weights @ vectors
+        await UserModel.update_interest(email, InterestProfile.encode(profile), now)
+        return profile
+
+    @staticmethod
+    async def current(email):
+        """The user's L2-normalized interest vector, or None if there is no usable profile."""
+        vector, _ = InterestProfile.decode(await UserModel.get_interest(email))
+        if vector is None:
+            return None
+        norm = np.linalg.norm(vector)
+        if norm < 1e-6:
+            return None
+        return vector / norm
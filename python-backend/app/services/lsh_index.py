@@ -0,0 +1,183 @@
+# app/services/lsh_index.py
+import numpy as np
+
+
+class RandomProjectionLSH:
+    """
+    Approximate nearest-neighbour index for cosine similarity over dense vectors,
+    using random hyperplane LSH in pure NumPy.
+
+    Each of n_tables tables hashes a vector to the n_bits signs of its projections on
+    random hyperplanes. Tables are stored as sorted code arrays, so a bucket lookup is
+    a binary search and inserts are merged in linear time. Recall/speed is tuned with
+    n_tables and n_bits (fixed at construction) and n_probes (per query: additional
+    buckets reached by flipping the least confident bits).
+
+    Ids are integers and must be inserted in increasing order. One writer may insert
+    and delete while other threads query: writers publish a new view atomically.
+
+    Only ids and codes are kept; the vectors stay wherever the caller stores them (the
+    memory-mapped VectorStore, in the service), so query() takes an accessor for them.
+    """
+
+    def __init__(self, dim, n_tables=8, n_bits=12, n_probes=1, seed=0):
+        if not 0 < n_bits <= 30:
+            raise ValueError("n_bits must be between 1 and 30")
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = n_probes
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((dim, n_tables * n_bits), dtype=np.float32)
+        self._bit_values = (1 << np.arange(n_bits)).astype(np.int32)
+        self._capacity = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._codes = np.empty((0, n_tables), dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._n_alive = 0
+        # (size, ids, alive, tables); tables[t] = (sorted codes, rows)
+        self._view = (0, self._ids, self._alive, [self._empty_table()] * n_tables)
+
+    def __len__(self):
+        return self._n_alive
+
+    @staticmethod
+    def _empty_table():
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+
+    def _projections(self, vectors):
+        return (vectors @ self.planes).reshape(len(vectors), self.n_tables, self.n_bits)
+
+    def _hash(self, projections):
+        return ((projections > 0) * self._bit_values).sum(axis=2, dtype=np.int32)
+
+    def _reserve(self, size):
+        if size <= self._capacity:
+            return
+        capacity = max(size, 2 * self._capacity, 1024)
+        old = self._view[0]
+        ids = np.empty(capacity, dtype=np.int64)
+        codes = np.empty((capacity, self.n_tables), dtype=np.int32)
+        alive = np.zeros(capacity, dtype=bool)
+        ids[:old] = self._ids[:old]
+        codes[:old] = self._codes[:old]
+        alive[:old] = self._alive[:old]
+        self._ids, self._codes, self._alive = ids, codes, alive
+        self._capacity = capacity
+
+    def insert(self, ids, vectors):
+        """Hash vectors (rows should be L2-normalized) under ids greater than any already inserted."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        if not len(ids):
+            return
+        size, _, _, tables = self._view
+        if np.any(np.diff(ids) <= 0) or (size and ids[0] <= self._ids[size - 1]):
+            raise ValueError("ids must be inserted in increasing order")
+
+        codes = self._hash(self._projections(vectors))
+        self._reserve(size + len(ids))
+        end = size + len(ids)
+        self._ids[size:end] = ids
+        self._codes[size:end] = codes
+        self._alive[size:end] = True
+
+        new_rows = np.arange(size, end, dtype=np.int32)
+        merged = []
+        for t, (sorted_codes, rows) in enumerate(tables):
+            order = np.argsort(codes[:, t], kind="stable")
+            batch_codes = codes[order, t]
+            at = np.searchsorted(sorted_codes, batch_codes, side="right")
+            merged.append((np.insert(sorted_codes, at, batch_codes), np.insert(rows, at, new_rows[order])))
+        self._n_alive += len(ids)
+        self._view = (end, self._ids, self._alive, merged)
+
+    def delete(self, ids):
+        """Remove ids from future results. Space is reclaimed once most rows are deleted."""
+        size, view_ids, alive, tables = self._view
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.searchsorted(view_ids[:size], ids)
+        found = rows < size
+        rows = rows[found]
+        rows = rows[(view_ids[rows] == ids[found]) & alive[rows]]
+        if not len(rows):
+            return
+        # Mark the rows dead on a copy, so readers holding the previous view are unaffected
+        alive = alive.copy()
+        alive[rows] = False
+        self._alive = alive
+        self._n_alive -= len(rows)
+        self._view = (size, view_ids, alive, tables)
+        if size and self._n_alive < size // 2:
+            self._compact()
+
+    def _compact(self):
+        size = self._view[0]
+        keep = np.flatnonzero(self._alive[:size])
+        n = len(keep)
+        old_ids, old_codes = self._ids, self._codes
+        # Fresh arrays, so readers holding the previous view are unaffected
+        self._capacity = max(n, 1024)
+        self._ids = np.empty(self._capacity, dtype=np.int64)
+        self._codes = np.empty((self._capacity, self.n_tables), dtype=np.int32)
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._ids[:n] = old_ids[keep]
+        self._codes[:n] = old_codes[keep]
+        self._alive[:n] = True
+
+        rows = np.arange(n, dtype=np.int32)
+        tables = []
+        for t in range(self.n_tables):
+            order = np.argsort(self._codes[:n, t], kind="stable")
+            tables.append((self._codes[order, t], rows[order]))
+        self._view = (n, self._ids, self._alive, tables)
+
+    def _candidate_rows(self, view, queries, n_probes):
+        size, _, alive, tables = view
+        projections = self._projections(queries)
+        codes = self._hash(projections)
+        if n_probes > 1:
+            # Flip the bits whose projections were closest to the hyperplane first
+            flips = np.argsort(np.abs(projections), axis=2)[:, :, :n_probes - 1]
+            probes = codes[:, :, None] ^ self._bit_values[flips]
+            codes = np.concatenate([codes[:, :, None], probes], axis=2)
+        else:
+            codes = codes[:, :, None]
+
+        found = []
+        for t, (sorted_codes, rows) in enumerate(tables):
+            probe_codes = codes[:, t, :].ravel()
+            lo = np.searchsorted(sorted_codes, probe_codes, side="left")
+            hi = np.searchsorted(sorted_codes, probe_codes, side="right")
+            lengths = hi - lo
+            total = int(lengths.sum())
+            if total:
+                starts = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+                found.append(rows[starts + np.arange(total)])
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        candidates = np.unique(np.concatenate(found))
+        candidates = candidates[candidates < size]
+        return candidates[alive[candidates]]
+
+    def candidates(self, queries, n_probes=None):
+        """Ids sharing a probed bucket with any of the query vectors (a shortlist for exact re-scoring)."""
+        view = self._view
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        rows = self._candidate_rows(view, queries, n_probes or self.n_probes)
+        return view[1][rows]
+
+    def query(self, vector, k, vectors, n_probes=None):
+        """
+        Approximate top-k (ids, cosine scores) for one query vector, best first. The
+        shortlist is re-scored exactly; vectors maps an array of ids to their rows.
+        """
+        view = self._view
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        ids = view[1][self._candidate_rows(view, vector[None, :], n_probes or self.n_probes)]
+        scores = np.asarray(vectors(ids), dtype=np.float32) @ vector
+        if len(ids) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return ids[order], scores[order]
@@ -136,14 +136,25 @@
 
 
 
-import requests
-import pandas as pd
+import asyncio
+import httpx
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from nltk.corpus import stopwords
+from app.services.article_corpus import ArticleCorpus
+from app.services import scoring, scoring_worker
+from app.services.candidates import CandidatePool
+from app.services.interest_profile import InterestProfile
+from app.services.lsh_index import RandomProjectionLSH
+from app.services.vector_store import VectorStore
+from app.services.vectorizer import OnlineTfidfVectorizer
+from app.utils.cache import TTLCache
+from app.utils.executor import CpuExecutor, ExecutorBusy
+from app.utils.http_client import get_http_client
+from app.utils.metrics import outbound_requests, outbound_retries
+from app.utils.profiling import stage
+from app.utils.text_normalizer import TextNormalizer
 import logging
-import re
+import os
+import threading
 import time
 
 logger = logging.getLogger(__name__)
@@ -153,57 +164,137 @@ class RecommendationService:
     def __init__(self):
         self.NEWSAPI_KEY = "YOUR_API_KEY_FROM_newsapi.org"  # Replace with your actual key
         self.NEWSAPI_URL = "https://newsapi.org/v2/everything"
-        self.tfidf_vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
-        self.ENGLISH_STOP_WORDS = set(stopwords.words('english'))
+        # Corpus-level TF-IDF statistics, persisted across restarts and updated by ingestion
+        self.vectorizer_path = os.getenv("VECTORIZER_PATH", "data/vectorizer.npz")
+        self.vectorizer = OnlineTfidfVectorizer.load(self.vectorizer_path)
+        # Imported here: the nltk package takes over a second to import, and only the word list is needed
+        from nltk.corpus import stopwords
+        self.ENGLISH_STOP_WORDS = frozenset(stopwords.words('english'))
+        self.normalizer = TextNormalizer(
+            self.ENGLISH_STOP_WORDS, cache_size=int(os.getenv("TEXT_CACHE_SIZE", "50000"))
+        )
+        # Upper bound on in-flight NewsAPI requests per worker
+        self.max_concurrent_fetches = int(os.getenv("NEWSAPI_MAX_CONCURRENCY", "5"))
+        self._fetch_semaphore = None
+        # Shared NewsAPI page cache keyed by normalized query params
+        self.news_cache = TTLCache(
+            maxsize=int(os.getenv("NEWS_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("NEWS_CACHE_TTL", "600")),
+            stale_ttl=float(os.getenv("NEWS_CACHE_STALE_TTL", "1800")),
+            name="news_cache",
+        )
+        # Locally ingested articles; filled by IngestionService. Once the corpus reaches
+        # lsh_min_corpus articles, only an LSH shortlist of it is scored exactly. Below that
+        # the blocked exact scan is about as fast, so with the default cap there is no index;
+        # raise CORPUS_MAX_ARTICLES to LSH_MIN_CORPUS or more to build one.
+        corpus_max_articles = int(os.getenv("CORPUS_MAX_ARTICLES", "20000"))
+        self.lsh_min_corpus = int(os.getenv("LSH_MIN_CORPUS", "50000"))
+        lsh_index = None
+        if self.lsh_min_corpus <= corpus_max_articles:
+            lsh_index = RandomProjectionLSH(
+                self.vectorizer.dense_dim,
+                n_tables=int(os.getenv("LSH_TABLES", "8")),
+                n_bits=int(os.getenv("LSH_BITS", "12")),
+                n_probes=int(os.getenv("LSH_PROBES", "4")),
+            )
+        # Article vectors, memory-mapped and shared by every worker on the host
+        self.vector_store = VectorStore(
+            os.getenv("VECTOR_STORE_DIR", "data/vectors"),
+            self.vectorizer.dense_dim,
+            block_size=int(os.getenv("VECTOR_BLOCK_SIZE", "8192")),
+        )
+        self.corpus = ArticleCorpus(
+            self.vectorizer,
+            self.vector_store,
+            max_size=corpus_max_articles,
+            index=lsh_index,
+        )
+        # Scoring runs here, off the event loop. Process workers preload the vectorizer
+        # statistics and map the vector store themselves.
+        self.executor = CpuExecutor(
+            mode=os.getenv("RECOMMEND_EXECUTOR", "thread"),
+            max_workers=int(os.getenv("RECOMMEND_EXECUTOR_WORKERS", "0")) or None,
+            max_pending=int(os.getenv("RECOMMEND_EXECUTOR_MAX_PENDING", "32")),
+            initializer=scoring_worker.init_worker,
+            initargs=(
+                self.vectorizer_path, self.vector_store.directory, self.vectorizer.dense_dim, self.vector_store.block_size
+            ),
+        )
 
     def _preprocess_text(self, text):
         """Preprocess text by removing punctuation, lowercasing, and filtering stop words."""
-        text = re.sub(r"[^\w\s]", "", text.lower())
-        words = [word for word in text.split() if word not in self.ENGLISH_STOP_WORDS]
-        return " ".join(words)
+        return self.normalizer.normalize(text)
+
+    def _preprocess_batch(self, texts):
+        """_preprocess_text over a list of titles in one pass."""
+        return self.normalizer.normalize_batch(texts)
 
     def _sanitize_query(self, text):
         """Sanitize query for NewsAPI by removing special characters and extracting key terms."""
-        text = text.encode('ascii', errors='ignore').decode('ascii')
-        text = re.sub(r"[^\w\s]", " ", text)
-        words = [word for word in text.split() if word not in self.ENGLISH_STOP_WORDS and len(word) > 2]
-        return " ".join(words[:3]) if words else text.split()[0]
-
-    def _fetch_news(self, liked_article_text):
-        """Fetch news articles with optimized retry logic"""
+        return self.normalizer.query_terms(text)
+
+    def _get_fetch_semaphore(self):
+        # Created lazily so it binds to the running event loop
+        if self._fetch_semaphore is None:
+            self._fetch_semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        return self._fetch_semaphore
+
+    async def _fetch_news(self, liked_article_text):
+        """Fetch news articles for a liked title, serving repeated queries from the response cache"""
+        params = {
+            "q": self._sanitize_query(liked_article_text),
+            "language": "en",
+            "pageSize": 50,
+            "sortBy": "relevancy"
+        }
+        articles = await self.news_cache.get_or_fetch(
+            self._news_cache_key(params), lambda: self._request_news(params)
+        )
+        return articles or []
+
+    @staticmethod
+    def _news_cache_key(params):
+        # NewsAPI matches q case-insensitively, so fold case to share entries
+        return tuple(sorted((k, v.lower() if k == "q" else v) for k, v in params.items()))
+
+    async def _request_news(self, params):
+        """Call NewsAPI with optimized retry logic. Returns None on failure so errors are not cached."""
         retries = 3
+        client = get_http_client()
+        semaphore = self._get_fetch_semaphore()
+        query = params["q"]
+        params = {**params, "apiKey": self.NEWSAPI_KEY}
         for attempt in range(retries):
-            query = self._sanitize_query(liked_article_text)
-            params = {
-                "q": query,
-                "apiKey": self.NEWSAPI_KEY,
-                "language": "en",
-                "pageSize": 50,
-                "sortBy": "relevancy"
-            }
             try:
-                response = requests.get(self.NEWSAPI_URL, params=params)
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(self.NEWSAPI_URL, params=params)
+                    except Exception:
+                        outbound_requests.labels("newsapi", "error").observe(time.perf_counter() - start)
+                        raise
+                    outbound_requests.labels("newsapi", str(response.status_code)).observe(time.perf_counter() - start)
                 response.raise_for_status()
                 data = response.json()
                 articles = data.get("articles", [])
-                if articles:
-                    return articles
-                logger.warning(f"No articles found for query: {query}")
-                return []
+                if not articles:
+                    logger.warning(f"No articles found for query: {query}")
+                return articles
 
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 if e.response.status_code == 429 and attempt < retries - 1:
-                    # Reduced wait time with exponential backoff (0.5s base)
+                    # Back off outside the semaphore so other fetches keep their slots
                     wait_time = (0.25 * (2 ** attempt))  # 0.25s → 0.5s → 1s
                     logger.warning(f"Rate limit hit (attempt {attempt+1}/{retries}). Waiting {wait_time:.1f}s...")
-                    time.sleep(wait_time)
+                    outbound_retries.labels("newsapi", "429").inc()
+                    await asyncio.sleep(wait_time)
                     continue
                 logger.error(f"API error for query '{query}': {str(e)}")
-                return []
+                return None
             except Exception as e:
                 logger.error(f"Unexpected error for query '{query}': {str(e)}")
-                return []
-        return []
+                return None
+        return None
 
     def _process_article(self, article):
         """Format raw article data into the required structure."""
@@ -217,16 +308,20 @@ class RecommendationService:
             "processed_text": ""
         }
 
-    def get_recommendations(self, liked_articles):
-        """Generate recommendations with reduced wait times"""
+    async def get_recommendations(self, liked_articles, top_k=None, per_article_quota=None):
+        """
+        Generate recommendations for all liked articles in one batched scoring pass.
+        :param top_k: Number of recommendations to return (default: 5 per liked article).
+        :param per_article_quota: If set, each liked article contributes at most this many of its own best matches.
+        """
         try:
             if not liked_articles:
                 return []
 
-            all_recommendations = []
             logger.debug(f"Received {len(liked_articles)} articles to process: {[art['title'] for art in liked_articles]}")
 
-            for idx, liked_article in enumerate(liked_articles):
+            liked_texts = []
+            for liked_article in liked_articles:
                 if not isinstance(liked_article, dict) or "title" not in liked_article:
                     logger.error(f"Invalid article format: {liked_article}")
                     continue
@@ -235,43 +330,213 @@ class RecommendationService:
                 if not liked_text:
                     logger.warning(f"Empty title for article: {liked_article}")
                     continue
+                liked_texts.append(liked_text)
 
-                raw_articles = self._fetch_news(liked_text)
-                if not raw_articles:
-                    continue
-
-                articles_df = pd.DataFrame([self._process_article(a) for a in raw_articles])
-                articles_df["processed_text"] = articles_df["title"].apply(self._preprocess_text)
-                if articles_df.empty:
-                    logger.warning(f"No processed articles for: '{liked_text}'")
-                    continue
-
-                all_texts = [self._preprocess_text(liked_text)] + articles_df["processed_text"].tolist()
-                tfidf_matrix = self.tfidf_vectorizer.fit_transform(all_texts)
-                liked_vector = tfidf_matrix[0]
-                article_vectors = tfidf_matrix[1:]
-
-                similarity_scores = cosine_similarity(liked_vector, article_vectors).flatten()
-                articles_df["score"] = similarity_scores
-
-                top_recs = articles_df.sort_values("score", ascending=False).head(5)
-                recommendations = top_recs.to_dict("records")
-
-                for rec in recommendations:
-                    rec.pop("score", None)
-                    rec.pop("processed_text", None)
-                all_recommendations.extend(recommendations)
+            if not liked_texts:
+                return []
 
-                # Reduced inter-article delay to 0.5 seconds
-                if idx < len(liked_articles) - 1:
-                    time.sleep(0.25)  # Half the previous delay
+            k = top_k or 5 * len(liked_texts)
+            if len(self.corpus):
+                snapshot = self.corpus.snapshot()
+                liked = await self.embed(liked_texts)
+                rows = await self._score_corpus(snapshot, liked, liked_texts, k, per_article_quota)
+                return snapshot.pool.to_records(rows)
 
-            return all_recommendations
+            candidates = await self._fetch_live_candidates(liked_texts)
+            if not len(candidates):
+                return []
+            # Don't recommend the liked articles back to the user
+            exclude = candidates.exclude_mask(liked_texts)
+            rows = await self._score_candidates(candidates, liked_texts, k, per_article_quota, exclude)
+            return candidates.to_records(rows)
 
+        except ExecutorBusy:
+            raise
         except Exception as e:
             logger.error(f"Recommendation error: {str(e)}")
             return []
 
+    async def stream_recommendations(self, liked_articles, per_article=5):
+        """
+        Async generator yielding ({"liked": title, "articles": [...]}) as each liked article's
+        candidates are scored, fastest first. Articles already yielded are not repeated.
+        """
+        liked_texts = [a["title"] for a in liked_articles if isinstance(a, dict) and a.get("title")]
+        if not liked_texts:
+            return
+        seen = set()
+
+        if len(self.corpus):
+            # Local corpus: scoring is fast, so score everything once and yield per liked article
+            snapshot = self.corpus.snapshot()
+            liked = await self.embed(liked_texts)
+            for text, query in zip(liked_texts, liked):
+                rows = await self._score_corpus(snapshot, query[None, :], liked_texts, per_article + len(seen))
+                rows = [row for row in rows if snapshot.pool.urls[row] not in seen][:per_article]
+                seen.update(snapshot.pool.urls[row] for row in rows)
+                yield {"liked": text, "articles": snapshot.pool.to_records(rows)}
+            return
+
+        async def fetch(text):
+            return text, await self._fetch_news(text)
+
+        tasks = [asyncio.ensure_future(fetch(text)) for text in liked_texts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                with stage("fetch"):
+                    text, page = await next_done
+                with stage("preprocess"):
+                    pool = CandidatePool.from_articles(
+                        (self._process_article(a) for a in page if a.get("url") not in seen),
+                        preprocess=self._preprocess_batch,
+                    )
+                if not len(pool):
+                    yield {"liked": text, "articles": []}
+                    continue
+                rows = await self._score_candidates(pool, [text], per_article, exclude=pool.exclude_mask(liked_texts))
+                seen.update(pool.urls[row] for row in rows)
+                yield {"liked": text, "articles": pool.to_records(rows)}
+        finally:
+            # The client may disconnect mid-stream
+            for task in tasks:
+                task.cancel()
+
+    async def get_profile_recommendations(self, email, liked_articles, top_k=None):
+        """
+        Score the corpus against the user's stored interest vector: one product instead of
+        one per liked article. Returns None when the user has no profile or nothing has been
+        ingested yet, so the caller can fall back to get_recommendations.
+        """
+        if not len(self.corpus):
+            return None
+        try:
+            profile = await InterestProfile.current(email)
+        except Exception as e:
+            logger.error(f"Failed to load interest profile for {email}: {e!r}")
+            return None
+        if profile is None or len(profile) != self.vectorizer.dense_dim:
+            return None
+        liked_texts = [a["title"] for a in liked_articles if a.get("title")]
+        snapshot = self.corpus.snapshot()
+        rows = await self._score_corpus(snapshot, profile[None, :], liked_texts, top_k or 5 * max(len(liked_texts), 1))
+        return snapshot.pool.to_records(rows)
+
+    def embed_titles(self, titles):
+        """Reduced, L2-normalized vectors for titles, comparable with the stored corpus vectors."""
+        with stage("preprocess"):
+            processed = self._preprocess_batch(titles)
+        with stage("vectorize"):
+            return self.vectorizer.reduce(self.vectorizer.transform(processed))
+
+    async def embed(self, titles):
+        """embed_titles on the scoring executor, off the event loop."""
+        if not self.executor.is_process:
+            return await self.executor.run(self.embed_titles, titles)
+        # Normalized here, where the memo lives; workers only vectorize
+        with stage("preprocess"):
+            processed = self._preprocess_batch(titles)
+        with stage("vectorize"):
+            return await self.executor.run(scoring_worker.embed_texts, self.vectorizer.n_docs, processed)
+
+    async def _score_corpus(self, snapshot, queries, exclude_titles, k, per_article_quota=None):
+        """
+        Rank corpus rows against dense query vectors using the stored article vectors: a blocked
+        product over the memory-mapped store (or only the LSH shortlist on a large corpus).
+        """
+        shortlist = None
+        if snapshot.index is not None and len(snapshot.pool) >= self.lsh_min_corpus:
+            with stage("score"):
+                shortlist = self._lsh_shortlist(snapshot, queries)
+        # Don't recommend the liked articles back to the user
+        exclude = snapshot.pool.exclude_mask(exclude_titles, rows=shortlist)
+        if self.executor.is_process:
+            doc_ids = snapshot.doc_ids if shortlist is None else snapshot.doc_ids[shortlist]
+            # Stage timers don't reach worker processes; the round trip counts as scoring
+            with stage("score"):
+                rows = await self.executor.run(
+                    scoring_worker.score_stored, queries, doc_ids, k, per_article_quota, exclude
+                )
+        else:
+            offsets = snapshot.offsets if shortlist is None else snapshot.offsets[shortlist]
+            rows = await self.executor.run(
+                scoring.score_vectors, snapshot.vectors, queries, offsets, k, per_article_quota, exclude,
+                self.vector_store.block_size,
+            )
+        return rows if shortlist is None else shortlist[rows]
+
+    async def _score_candidates(self, candidates, liked_texts, k, per_article_quota=None, exclude=None):
+        """Rank a live CandidatePool against liked titles with the TF-IDF vectorizer."""
+        with stage("preprocess"):
+            liked_processed = self._preprocess_batch(liked_texts)
+        if self.executor.is_process:
+            with stage("score"):
+                return await self.executor.run(
+                    scoring_worker.score_texts, self.vectorizer.n_docs, candidates.processed_text, liked_processed,
+                    k, per_article_quota, exclude,
+                )
+        return await self.executor.run(
+            scoring.score_texts, self.vectorizer, candidates.processed_text, liked_processed, k, per_article_quota, exclude
+        )
+
+    def _lsh_shortlist(self, snapshot, liked):
+        """Corpus rows that share an LSH bucket with any liked article."""
+        ids = snapshot.index.candidates(liked)
+        # The index may already hold ids from a newer reindex than this snapshot
+        rows = np.searchsorted(snapshot.doc_ids, ids)
+        rows = rows[rows < len(snapshot.doc_ids)]
+        return rows[np.isin(snapshot.doc_ids[rows], ids)]
+
+    async def _fetch_live_candidates(self, liked_texts):
+        """Cold start (nothing ingested yet): build a deduplicated candidate pool from live NewsAPI queries."""
+        # Fan out every call at once; the semaphore bounds concurrency
+        with stage("fetch"):
+            pages = await asyncio.gather(*(self._fetch_news(text) for text in liked_texts))
+
+        with stage("preprocess"):
+            pool = CandidatePool.from_articles(
+                (self._process_article(a) for page in pages for a in page), preprocess=self._preprocess_batch
+            )
+        if not len(pool):
+            logger.warning(f"No live articles found for {len(liked_texts)} liked titles")
+        return pool
+
+_service = None
+_service_lock = threading.Lock()
+_service_loading = None
+
+
+def get_recommendation_service():
+    """Process-wide RecommendationService shared by the router and the ingestion loop."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = RecommendationService()
+    return _service
+
+
+async def load_recommendation_service():
+    """
+    get_recommendation_service for the event loop: building the service loads nltk and the
+    vectorizer statistics, so the first call does it on a thread and every caller awaits that.
+    """
+    global _service_loading
+    if _service is not None:
+        return _service
+    if _service_loading is None:
+        _service_loading = asyncio.get_running_loop().run_in_executor(None, get_recommendation_service)
+    try:
+        return await asyncio.shield(_service_loading)
+    except Exception:
+        # Let the next caller retry
+        _service_loading = None
+        raise
+
+
+def peek_recommendation_service():
+    """The service if it has been built, else None; for stats that must not trigger the build."""
+    return _service
+
 
 
 
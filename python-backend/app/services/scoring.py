@@ -0,0 +1,51 @@
+# app/services/scoring.py
+from app.utils.profiling import stage
+import numpy as np
+
+
+def rank(scores, k, per_article_quota=None, exclude=None):
+    """
+    Return the row indices of the global top-k candidates, best first, from a
+    (candidates x liked articles) score matrix. Each candidate is ranked by its best score.
+    """
+    if exclude is not None and exclude.any():
+        scores = scores.copy()
+        scores[exclude] = 0.0
+    best = scores.max(axis=1)
+
+    if per_article_quota:
+        # Each liked article's own top candidates, merged and deduplicated
+        quota = min(per_article_quota, scores.shape[0])
+        top = np.argpartition(-scores, quota - 1, axis=0)[:quota]
+        keep = np.take_along_axis(scores, top, axis=0) > 0
+        rows = np.unique(top[keep])
+    else:
+        rows = np.flatnonzero(best > 0)
+
+    if len(rows) > k:
+        rows = rows[np.argpartition(-best[rows], k - 1)[:k]]
+    return rows[np.argsort(-best[rows], kind="stable")]
+
+
+def score_texts(vectorizer, candidate_texts, liked_texts, k, per_article_quota=None, exclude=None):
+    """
+    Rank preprocessed candidate texts against preprocessed liked texts with one sparse
+    product; rows are L2-normalized, so each entry is a cosine similarity.
+    """
+    with stage("vectorize"):
+        matrix = vectorizer.transform(candidate_texts)
+        liked_matrix = vectorizer.transform(liked_texts)
+    with stage("score"):
+        scores = (matrix @ liked_matrix.T).toarray()
+    with stage("rank"):
+        return rank(scores, k, per_article_quota, exclude)
+
+
+def score_vectors(view, queries, offsets, k, per_article_quota=None, exclude=None, block_size=8192):
+    """Rank stored vectors (VectorView rows at offsets) against dense queries; returns positions into offsets."""
+    with stage("score"):
+        positions, scores = view.search(
+            queries, offsets, k, per_query=per_article_quota, exclude=exclude, block_size=block_size
+        )
+    with stage("rank"):
+        return positions[rank(scores, k, per_article_quota)]
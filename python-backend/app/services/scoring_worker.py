@@ -0,0 +1,51 @@
+# app/services/scoring_worker.py
+"""
+Entry points for the process-pool executor. Each worker process loads the vectorizer
+statistics once (initializer) and maps the shared vector store itself, so a task only
+ships small arguments: texts, query vectors and doc ids.
+"""
+from app.services import scoring
+from app.services.vector_store import VectorStore
+from app.services.vectorizer import OnlineTfidfVectorizer
+import numpy as np
+
+_state = {}
+
+
+def init_worker(vectorizer_path, store_dir, dim, block_size):
+    _state["vectorizer_path"] = vectorizer_path
+    _state["vectorizer"] = OnlineTfidfVectorizer.load(vectorizer_path)
+    _state["store"] = VectorStore(store_dir, dim, block_size=block_size)
+
+
+def _vectorizer(n_docs):
+    # The parent saves its statistics after each ingestion run. Compared with what was actually
+    # loaded, since the file can lag the parent; reload() only re-reads a file that changed
+    vectorizer = _state["vectorizer"]
+    if n_docs != vectorizer.n_docs:
+        vectorizer.reload(_state["vectorizer_path"])
+    return vectorizer
+
+
+def embed_texts(n_docs, texts):
+    """OnlineTfidfVectorizer.reduce(transform()) of already normalized texts."""
+    vectorizer = _vectorizer(n_docs)
+    return vectorizer.reduce(vectorizer.transform(texts))
+
+
+def score_texts(n_docs, candidate_texts, liked_texts, k, per_article_quota=None, exclude=None):
+    return scoring.score_texts(_vectorizer(n_docs), candidate_texts, liked_texts, k, per_article_quota, exclude)
+
+
+def score_stored(queries, doc_ids, k, per_article_quota=None, exclude=None):
+    """Like scoring.score_vectors, addressed by doc id; returns positions into doc_ids."""
+    store = _state["store"]
+    view = store.refresh()
+    offsets = view.offsets(doc_ids)
+    present = np.flatnonzero(offsets >= 0)
+    if exclude is not None:
+        exclude = exclude[present]
+    positions = scoring.score_vectors(
+        view, queries, offsets[present], k, per_article_quota, exclude, block_size=store.block_size
+    )
+    return present[positions]
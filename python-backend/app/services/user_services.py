@@ -1,11 +1,18 @@
 # app/services/user_services.py
+from app.models.like_model import LikeModel
 from app.models.user_model import UserModel
-from datetime import timedelta
+from app.services.interest_profile import InterestProfile
+from app.services.recommend_service import load_recommendation_service
+from datetime import datetime, timedelta
 from app.utils.auth import generate_token
 from fastapi import HTTPException
-import bcrypt
+from app.utils.executor import ExecutorBusy
+from app.utils.passwords import needs_rehash, hash_password, verify_password
 from bson import ObjectId
 from fastapi.encoders import jsonable_encoder
+import logging
+
+logger = logging.getLogger(__name__)
 
 # app/services/user_services.py
 class UserServices:
@@ -39,25 +46,17 @@ class UserServices:
     @staticmethod
     async def register_user(email, password, username, phone):
         try:
-            # Check for duplicates
-            existing_email = await UserModel.find_user_by_email(email)
-            existing_username = await UserModel.find_user_by_username(username)
-            existing_phone = await UserModel.find_user_by_phone(phone)
-
-            if existing_email is not None:
-                raise HTTPException(status_code=400, detail="Email already registered")
-            if existing_username is not None:
-                raise HTTPException(status_code=400, detail="Username already taken")
-            if existing_phone is not None:
-                raise HTTPException(status_code=400, detail="Phone number already registered")
-
+            # One insert; the unique indexes on email/username/phone reject duplicates
+            # and create_user maps them to the 400 messages
             await UserModel.create_user(email, password, username, phone)
             return {"status": True, "message": "User registered successfully"}
 
         except HTTPException as e:
             raise e
+        except ExecutorBusy:
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
         except Exception as e:
-            print("Registration error:", e)
+            logger.error(f"Registration error: {e!r}")
             raise HTTPException(status_code=500, detail="Internal server error")
         
     @staticmethod
@@ -65,7 +64,7 @@ class UserServices:
         try:
             return await UserModel.find_user_by_email(email)
         except Exception as e:
-            print(f"Error finding user by email: {e}")
+            logger.error(f"Error finding user by email: {e}")
             raise HTTPException(status_code=500, detail="Database error")
 
     @staticmethod
@@ -73,7 +72,7 @@ class UserServices:
         try:
             return await UserModel.find_user_by_username(username)
         except Exception as e:
-            print(f"Error finding user by username: {e}")
+            logger.error(f"Error finding user by username: {e}")
             raise HTTPException(status_code=500, detail="Database error")
 
     @staticmethod
@@ -81,7 +80,7 @@ class UserServices:
         try:
             return await UserModel.find_user_by_phone(phone)
         except Exception as e:
-            print(f"Error finding user by phone: {e}")
+            logger.error(f"Error finding user by phone: {e}")
             raise HTTPException(status_code=500, detail="Database error")
 
     @staticmethod
@@ -93,9 +92,10 @@ class UserServices:
                 raise HTTPException(status_code=404, detail="User does not exist")
 
             # Verify the password
-            is_password_correct = bcrypt.checkpw(password.encode(), user["password"])
+            is_password_correct = await verify_password(password, user["password"])
             if not is_password_correct:
                 raise HTTPException(status_code=401, detail="Invalid credentials")
+            await UserServices.rehash_password_if_needed(user, password)
 
             # Generate JWT token
             token_data = {"email": user["email"]}
@@ -104,68 +104,121 @@ class UserServices:
 
         except HTTPException as e:
             raise e
+        except ExecutorBusy:
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
+    @staticmethod
+    async def rehash_password_if_needed(user, password):
+        """After a successful login, re-hash a password stored with an outdated bcrypt cost."""
+        try:
+            if needs_rehash(user["password"]):
+                await UserModel.update_password_hash(user["email"], await hash_password(password))
+        except Exception as e:
+            # The login already succeeded; try again next time
+            logger.error(f"Error re-hashing password: {e}")
+
     @staticmethod
     async def like_article(email: str, article_title: str, article_category: str):
         try:
-            # Delegate to UserModel.like_article (uses $push)
-            return await UserModel.like_article(email, article_title, article_category)
+            # Embedded once and kept on the like, so unliking subtracts exactly what this added
+            vector = await UserServices._embed_title(article_title)
+            encoded = InterestProfile.encode(vector) if vector is not None else None
+            # Idempotent: liking an already liked article changes nothing
+            like = await UserModel.like_article(email, article_title, article_category, encoded)
+            if like is not None:
+                await UserServices._update_interest(email, vector, 1.0, like["likedAt"])
+            return True
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
     @staticmethod
     async def unlike_article(email: str, article_title: str):
         try:
-            return await UserModel.unlike_article(email, article_title)
+            removed = await UserModel.unlike_article(email, article_title)
+            if removed is not None:
+                vector = InterestProfile.decode_vector(removed.get("vector"))
+                await UserServices._update_interest(email, vector, -1.0, removed.get("likedAt"))
+            return True
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
+    @staticmethod
+    async def _embed_title(article_title: str):
+        """The title's reduced vector, or None if it can't be computed right now."""
+        try:
+            service = await load_recommendation_service()
+            return (await service.embed([article_title]))[0]
+        except Exception as e:
+            logger.error(f"Error embedding liked title: {e}")
+            return None
+
+    @staticmethod
+    async def _update_interest(email: str, vector, weight: float, liked_at: datetime = None):
+        """Fold a like (weight 1) or unlike (weight -1) of vector into the user's interest profile."""
+        try:
+            if vector is not None and await InterestProfile.apply(email, vector, weight, liked_at):
+                return
+            # No profile yet (e.g. likes from before profiles existed), or a like stored without
+            # its vector: rebuild from all likes
+            service = await load_recommendation_service()
+            liked_articles = await UserModel.get_liked_articles(email, with_vectors=True)
+            await InterestProfile.rebuild(email, liked_articles, service.embed)
+        except Exception as e:
+            # The like itself succeeded; recommendations fall back to the liked titles
+            logger.error(f"Error updating interest profile: {e}")
+
 
     @staticmethod
     async def get_user_details(email: str):
         try:
-            user = await UserModel.find_user_by_email(email)
-            if not user:
+            # Cached, and already without the password and profile vector
+            user_details = await UserModel.get_user_profile(email)
+            if not user_details:
                 raise HTTPException(status_code=404, detail="User not found")
 
-            # Convert MongoDB document to dict and remove password
-            user_details = dict(user)  # Explicit conversion to dictionary
-            user_details.pop("password", None)
             user_details.pop("_id", None)  # Remove MongoDB ObjectId
             
             return user_details
         except HTTPException as e:
             raise e
         except Exception as e:
-            print("---> err -->", e)
+            logger.error(f"Unexpected error: {e!r}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
     @staticmethod
     async def get_liked_articles(email: str):
         try:
-            print(f"\n🔍 [DEBUG] Fetching liked articles for email: {email}")
             
-            user = await UserModel.find_user_by_email(email)
-            if not user:
-                print(f"⚠️ [WARN] User not found for email: {email}")
-                return []
-                
-            liked_articles = user.get("likedArticles", [])
-            print(f"✅ [SUCCESS] Found {len(liked_articles)} liked articles for {email}:")
-            for idx, article in enumerate(liked_articles, 1):
-                print(f"   {idx}. {article.get('title')} ({article.get('category')})")
-                
+            # Oldest first, as the client expects; unknown users simply have no likes
+            liked_articles = await UserModel.get_liked_articles(email)
+            logger.debug("Found liked articles", extra={"email": email, "count": len(liked_articles)})
             return liked_articles
             
         except Exception as e:
-            print(f"🔥 [ERROR] Failed to get liked articles: {str(e)}")
-            return []
\ No newline at end of file
+            logger.error(f"Failed to get liked articles: {e!r}")
+            return []
+
+    @staticmethod
+    async def get_liked_page(email: str, limit: int, before: str = None, after: str = None):
+        """One page of liked articles (oldest first) with cursors for the neighbouring pages."""
+        likes, has_more = await UserModel.get_liked_page(email, limit, before=before, after=after)
+        return {
+            "likedArticles": likes,
+            "hasMore": has_more,
+            # Pass "before" to get older likes, "after" to get newer ones
+            "before": LikeModel.encode_cursor(likes[0]) if likes else before,
+            "after": LikeModel.encode_cursor(likes[-1]) if likes else after,
+        }
+
+    @staticmethod
+    async def count_liked_articles(email: str):
+        return await UserModel.count_liked_articles(email)
@@ -0,0 +1,230 @@
+# app/services/vector_store.py
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import uuid
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, run a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class VectorView:
+    """
+    Read-only, memory-mapped view of the store at one point in time. Views are never
+    modified, so a request can keep using one while the store is appended to or compacted.
+    """
+
+    __slots__ = ("ids", "vectors", "generation", "store_id")
+
+    def __init__(self, ids, vectors, generation, store_id=None):
+        self.ids = ids
+        self.vectors = vectors
+        self.generation = generation
+        self.store_id = store_id
+
+    def __len__(self):
+        return len(self.ids)
+
+    def offsets(self, ids):
+        """Row offset of each id, or -1 for ids not in this view. Stored ids are ascending."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(ids), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        return np.where(self.ids[rows] == ids, rows, -1)
+
+    def search(self, queries, rows, k, per_query=None, exclude=None, block_size=8192):
+        """
+        Score the vectors at offsets rows (ascending) against every query, one block at a
+        time, and keep each block's best k rows by their best score, plus its per_query best
+        rows per query if given. Only one block of scores is ever materialized.
+        Returns (positions into rows, their scores matrix) for final ranking.
+        """
+        queries_t = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.float32).T
+        n = len(rows)
+        # Corpus rows are usually one contiguous run: slice the map instead of gathering
+        contiguous = n > 0 and rows[-1] - rows[0] == n - 1
+        positions, kept = [], []
+        for start in range(0, n, block_size):
+            end = min(start + block_size, n)
+            if contiguous:
+                block = self.vectors[rows[0] + start:rows[0] + end]
+            else:
+                block = self.vectors[rows[start:end]]
+            scores = np.asarray(block @ queries_t)
+            if exclude is not None:
+                scores[exclude[start:end]] = 0.0
+            local = self._block_top(scores, k, per_query)
+            positions.append(local + start)
+            kept.append(scores[local])
+        if not positions:
+            return np.empty(0, dtype=np.int64), np.empty((0, queries_t.shape[1]), dtype=np.float32)
+        return np.concatenate(positions), np.concatenate(kept)
+
+    @staticmethod
+    def _block_top(scores, k, per_query):
+        if len(scores) <= k:
+            return np.arange(len(scores))
+        best = scores.max(axis=1)
+        top = np.argpartition(-best, k - 1)[:k]
+        if per_query:
+            quota = min(per_query, len(scores))
+            top = np.union1d(top, np.argpartition(-scores, quota - 1, axis=0)[:quota].ravel())
+        return top
+
+
+class VectorStore:
+    """
+    Append-only store of fixed-size float32 vectors on disk, memory-mapped for reading.
+
+    A generation is two files: vectors-<gen>.f32 (raw rows) and ids-<gen>.i64, the sidecar
+    id -> offset index (row i holds the id of vector i; ids only increase, so lookups are
+    binary searches). CURRENT names the live generation. Appends are serialized across
+    processes with a file lock, so every uvicorn worker can map the same files and share
+    their pages through the OS cache; a restart just maps them again.
+
+    CURRENT also holds the store's id, a random token created with the store and kept
+    across compactions. Vector ids are only meaningful within one store, so anything that
+    persists them elsewhere should save the store id alongside and check it on the way back.
+    """
+
+    def __init__(self, directory, dim, block_size=8192):
+        self.directory = directory
+        self.dim = dim
+        self.block_size = block_size
+        self._view = VectorView(np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float32), None)
+        self._refresh_lock = threading.Lock()
+        self._writer_file = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def is_writer(self):
+        return self._writer_file is not None or fcntl is None
+
+    def acquire_writer(self):
+        """Try to become the one process that ingests into this store. Returns True on success."""
+        if self.is_writer:
+            return True
+        f = open(os.path.join(self.directory, "writer.lock"), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._writer_file = f
+        return True
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.directory, "store.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _paths(self, generation):
+        return (
+            os.path.join(self.directory, f"ids-{generation}.i64"),
+            os.path.join(self.directory, f"vectors-{generation}.f32"),
+        )
+
+    def _read_current(self):
+        try:
+            with open(os.path.join(self.directory, "CURRENT")) as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if current.get("dim") != self.dim:
+            logger.warning(f"Ignoring vector store with dim {current.get('dim')} (expected {self.dim})")
+            return None
+        return current
+
+    def _write_current(self, generation, store_id):
+        path = os.path.join(self.directory, "CURRENT")
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"generation": generation, "dim": self.dim, "store": store_id}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def view(self):
+        return self._view
+
+    def refresh(self):
+        """Map whatever has been appended since the last refresh, by this or another process."""
+        with self._refresh_lock:
+            current = self._read_current()
+            if current is None:
+                return self._view
+            generation, store_id = current["generation"], current.get("store")
+            ids_path, vectors_path = self._paths(generation)
+            try:
+                count = os.path.getsize(ids_path) // 8
+            except OSError:
+                return self._view
+            view = self._view
+            if generation == view.generation and count == len(view) and store_id == view.store_id:
+                return view
+            if count:
+                # Vectors are written before their ids, so the first count rows are complete
+                ids = np.memmap(ids_path, dtype=np.int64, mode="r", shape=(count,))
+                vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+            else:
+                ids, vectors = np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+            self._view = VectorView(ids, vectors, generation, store_id)
+            return self._view
+
+    def append(self, vectors):
+        """Append rows and return the ids assigned to them."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._locked():
+            current = self._read_current()
+            if current is None:
+                current = {"generation": 0}
+                for path in self._paths(0):
+                    open(path, "wb").close()
+            if not current.get("store"):
+                # New store, or one written before stores had ids: nothing can vouch for ids saved against it
+                current["store"] = uuid.uuid4().hex
+                self._write_current(current["generation"], current["store"])
+            generation = current["generation"]
+            ids_path, vectors_path = self._paths(generation)
+            count = os.path.getsize(ids_path) // 8
+            next_id = 0
+            if count:
+                next_id = int(np.fromfile(ids_path, dtype=np.int64, count=1, offset=(count - 1) * 8)[0]) + 1
+            ids = np.arange(next_id, next_id + len(vectors), dtype=np.int64)
+            with open(vectors_path, "r+b") as f:
+                # Drop rows left behind by an append that died before writing its ids
+                f.truncate(count * self.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(vectors.tobytes())
+            with open(ids_path, "ab") as f:
+                f.write(ids.tobytes())
+        self.refresh()
+        return ids
+
+    def compact(self, live_ids):
+        """Rewrite the store keeping only live_ids, as a new generation. Existing views stay valid."""
+        with self._locked():
+            view = self.refresh()
+            offsets = view.offsets(np.unique(np.asarray(live_ids, dtype=np.int64)))
+            offsets = offsets[offsets >= 0]
+            generation = (view.generation or 0) + 1
+            ids_path, vectors_path = self._paths(generation)
+            with open(vectors_path, "wb") as f:
+                for start in range(0, len(offsets), self.block_size):
+                    f.write(np.ascontiguousarray(view.vectors[offsets[start:start + self.block_size]]).tobytes())
+            with open(ids_path, "wb") as f:
+                f.write(np.ascontiguousarray(view.ids[offsets]).tobytes())
+            self._write_current(generation, view.store_id)
+            # Processes still mapping the old files keep them alive until they refresh
+            if view.generation is not None:
+                for path in self._paths(view.generation):
+                    os.remove(path)
+        logger.info(f"Compacted vector store from {len(view)} to {len(offsets)} rows")
+        return self.refresh()
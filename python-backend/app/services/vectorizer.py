@@ -0,0 +1,146 @@
+# app/services/vectorizer.py
+from scipy import sparse
+import numpy as np
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class OnlineTfidfVectorizer:
+    """
+    TF-IDF over hashed term features with document frequencies that are updated
+    incrementally as articles are ingested, so requests only ever call transform().
+    IDF uses the same smoothed formula as sklearn's TfidfVectorizer.
+
+    reduce() maps TF-IDF rows to dense_dim-dimensional vectors with a fixed sparse
+    random sign projection (each feature lands on PROJECTION_NNZ random dimensions),
+    which approximately preserves cosine similarity. The projection is saved with
+    the statistics so stored dense vectors stay comparable across restarts.
+    """
+
+    PROJECTION_NNZ = 4
+
+    def __init__(self, n_features=2 ** 18, dense_dim=256, seed=0):
+        self.n_features = n_features
+        self.dense_dim = dense_dim
+        # sklearn takes most of a second to import; deferred so importing the app stays fast
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self._hasher = HashingVectorizer(
+            n_features=n_features, stop_words='english', alternate_sign=False, norm=None
+        )
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self._idf = None
+        rng = np.random.default_rng(seed)
+        self._projection_cols = rng.integers(0, dense_dim, size=(n_features, self.PROJECTION_NNZ), dtype=np.int16)
+        self._projection_signs = rng.choice(np.array([-1, 1], dtype=np.int8), size=(n_features, self.PROJECTION_NNZ))
+        self._projection = None
+        self._saved_mtime = None  # of the file these statistics were last loaded from or saved to
+
+    def partial_fit(self, texts):
+        """Count each text once per term it contains. The tables are swapped, never mutated in place."""
+        texts = list(texts)
+        if not texts:
+            return self
+        counts = self._hasher.transform(texts)
+        self.df = self.df + np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs += len(texts)
+        self._idf = None
+        return self
+
+    def idf(self):
+        idf = self._idf
+        if idf is None:
+            idf = np.log((1 + self.n_docs) / (1 + self.df)) + 1.0
+            self._idf = idf
+        return idf
+
+    def transform(self, texts, idf=None):
+        """Return an L2-normalized CSR matrix; pass idf to score against a matrix built with an older table."""
+        matrix = self._hasher.transform(texts).astype(np.float32)
+        if idf is None:
+            idf = self.idf()
+        matrix.data *= idf[matrix.indices]
+        from sklearn.preprocessing import normalize
+        return normalize(matrix, norm='l2', copy=False)
+
+    def reduce(self, matrix):
+        """Project transform() output to L2-normalized dense float32 rows of size dense_dim."""
+        projection = self._projection
+        if projection is None:
+            rows = np.repeat(np.arange(self.n_features), self.PROJECTION_NNZ)
+            values = self._projection_signs.ravel().astype(np.float32) / np.sqrt(self.PROJECTION_NNZ)
+            projection = sparse.csr_matrix(
+                (values, (rows, self._projection_cols.ravel())), shape=(self.n_features, self.dense_dim)
+            )
+            self._projection = projection
+        dense = np.asarray((matrix @ projection).todense(), dtype=np.float32)
+        from sklearn.preprocessing import normalize
+        return normalize(dense, norm='l2', copy=False)
+
+    def save(self, path):
+        """Write the document-frequency table and projection atomically; only non-zero counts are stored."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        df = self.df
+        nonzero = np.flatnonzero(df)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                n_features=self.n_features,
+                n_docs=self.n_docs,
+                indices=nonzero.astype(np.int32),
+                counts=df[nonzero],
+                dense_dim=self.dense_dim,
+                projection_cols=self._projection_cols,
+                projection_signs=self._projection_signs,
+            )
+        os.replace(tmp_path, path)
+        self._saved_mtime = os.stat(path).st_mtime_ns
+
+    def reload(self, path):
+        """
+        Adopt the document frequencies saved at path by another process, if they changed since
+        this instance last loaded or saved them. Returns True if they were reloaded.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._saved_mtime:
+            return False
+        with np.load(path) as data:
+            n_docs = int(data["n_docs"])
+            if n_docs == self.n_docs or int(data["n_features"]) != self.n_features:
+                self._saved_mtime = mtime
+                return False
+            df = np.zeros(self.n_features, dtype=np.int64)
+            df[data["indices"]] = data["counts"]
+        # Swapped, not mutated, as in partial_fit
+        self.df = df
+        self.n_docs = n_docs
+        self._idf = None
+        self._saved_mtime = mtime
+        logger.info(f"Reloaded vectorizer statistics for {n_docs} documents from {path}")
+        return True
+
+    @classmethod
+    def load(cls, path, n_features=2 ** 18, dense_dim=256):
+        """Load a saved table, or return an empty vectorizer if there is none."""
+        if not os.path.exists(path):
+            return cls(n_features, dense_dim)
+        with np.load(path) as data:
+            if "projection_cols" in data:
+                vectorizer = cls(int(data["n_features"]), int(data["dense_dim"]))
+                vectorizer._projection_cols = data["projection_cols"]
+                vectorizer._projection_signs = data["projection_signs"]
+            else:
+                vectorizer = cls(int(data["n_features"]), dense_dim)
+            vectorizer.df[data["indices"]] = data["counts"]
+            vectorizer.n_docs = int(data["n_docs"])
+        vectorizer._saved_mtime = os.stat(path).st_mtime_ns
+        logger.info(f"Loaded vectorizer statistics for {vectorizer.n_docs} documents from {path}")
+        return vectorizer
@@ -0,0 +1,111 @@
+# app/utils/cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-process LRU cache with a TTL and an optional stale-while-revalidate window.
+    :param maxsize: Maximum number of entries; the least recently used entry is evicted first.
+    :param ttl: Seconds an entry is served as fresh.
+    :param stale_ttl: Extra seconds an expired entry may still be served while it is refreshed in the background.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, stale_ttl=0, name="cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._inflight = {}  # key -> asyncio.Task loading that key
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return a fresh value for key, or default. Expired entries are treated as misses."""
+        entry = self._data.get(key)
+        if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    async def get_or_fetch(self, key, fetch):
+        """
+        Return the cached value for key, calling the coroutine function fetch() on a miss.
+        Stale entries are returned immediately and refreshed in the background.
+        Concurrent misses for the same key share a single fetch. A fetch result of None is not cached.
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, fetch)
+                return value
+            del self._data[key]
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key, fetch)
+        return await asyncio.shield(task)
+
+    def _start_load(self, key, fetch):
+        task = asyncio.ensure_future(self._load(key, fetch))
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key, fetch):
+        try:
+            value = await fetch()
+            if value is not None:
+                self.set(key, value)
+            return value
+        except Exception as e:
+            logger.warning(f"{self.name}: refresh failed for {key!r}: {e}")
+            return None
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,161 @@
+# app/utils/executor.py
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _noop():
+    return None
+
+
+class ExecutorBusy(Exception):
+    """Raised instead of queueing when max_pending tasks are already waiting or running."""
+
+
+class CpuExecutor:
+    """
+    Runs CPU-bound work off the event loop.
+    :param mode: "thread" (NumPy/SciPy release the GIL in the heavy parts), "process"
+                 (a spawned pool; fn must be a picklable module-level function and
+                 initializer preloads per-process state) or "inline" (no offloading).
+    :param max_pending: Bound on queued plus running tasks; beyond it run() raises ExecutorBusy
+                        so overload turns into fast 503s instead of growing latency.
+    """
+
+    def __init__(self, mode="thread", max_workers=None, max_pending=32, initializer=None, initargs=()):
+        if mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers or (os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self._initializer = initializer
+        self._initargs = initargs
+        self._pool = None
+
+    @property
+    def is_process(self):
+        return self.mode == "process"
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self._initializer,
+                    initargs=self._initargs,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+        return self._pool
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorBusy(f"{self.pending} tasks pending")
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            if self.mode == "inline":
+                return fn(*args)
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                # Keep context variables (request-scoped state) visible inside the task
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(self._get_pool(), partial(context.run, fn, *args))
+            return await loop.run_in_executor(self._get_pool(), partial(fn, *args))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.busy_seconds += time.perf_counter() - start
+
+    async def warm_up(self):
+        """Start every process worker (running its initializer) before the first request needs one."""
+        if self.mode != "process":
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, _noop) for _ in range(self.max_workers)))
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_task_ms": 1000 * self.busy_seconds / self.completed if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic sleep wakes up. Sustained lag means
+    something is blocking the loop, which delays every request on the worker.
+    """
+
+    def __init__(self, interval=0.5, warn_after=0.1):
+        self.interval = interval
+        self.warn_after = warn_after
+        self.last = 0.0
+        self.max = 0.0
+        self.average = 0.0  # exponentially weighted
+        self.samples = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.last = lag
+            self.max = max(self.max, lag)
+            self.average = lag if not self.samples else 0.9 * self.average + 0.1 * lag
+            self.samples += 1
+            if lag > self.warn_after:
+                logger.warning(f"Event loop lag {lag * 1000:.0f} ms")
+
+    def stats(self):
+        return {
+            "lag_ms": self.last * 1000,
+            "avg_lag_ms": self.average * 1000,
+            "max_lag_ms": self.max * 1000,
+            "samples": self.samples,
+        }
+
+
+loop_monitor = LoopLagMonitor(
+    interval=float(os.getenv("LOOP_LAG_INTERVAL", "0.5")),
+    warn_after=float(os.getenv("LOOP_LAG_WARN_MS", "100")) / 1000,
+)
@@ -0,0 +1,37 @@
+# app/utils/http_client.py
+import logging
+import os
+import httpx
+
+# httpx logs every request URL at INFO, which would write the NewsAPI key to app.log
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Shared keep-alive client for outbound calls (NewsAPI). One pool per worker
+# process, reused across requests so the TLS handshake is paid once.
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+client = None
+
+
+def get_http_client():
+    global client
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return client
+
+
+async def close_http_client():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
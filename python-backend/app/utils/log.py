@@ -0,0 +1,184 @@
+# app/utils/log.py
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# Path of the request being handled, so records can be sampled and tagged per route
+current_route = ContextVar("current_route", default=None)
+
+# Attributes every LogRecord has; anything else was passed through extra= and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+_queue = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, route and any extra= fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered by DroppingQueueHandler.prepare
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RouteFilter(logging.Filter):
+    """
+    Tags records with the current route, then samples and rate-limits them per route
+    before they are queued, so dropped records cost almost nothing on the event loop.
+    :param sample_rates: Route -> fraction of INFO and DEBUG records kept; warnings and errors are always kept.
+    :param default_rate: Fraction kept for routes not in sample_rates (and outside requests).
+    :param rate_limit: INFO and DEBUG records per second allowed per route, with an equal burst;
+                       0 disables it. Warnings and errors are never limited. The number of
+                       records dropped is reported on the next one let through.
+    """
+
+    def __init__(self, sample_rates=None, default_rate=1.0, rate_limit=0):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.default_rate = default_rate
+        self.rate_limit = rate_limit
+        self._buckets = {}  # route -> [tokens, last refill, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        route = current_route.get()
+        record.route = route
+        # An INFO flood on a route must not take that route's errors down with it
+        important = record.levelno >= logging.WARNING
+        if not important:
+            rate = self.sample_rates.get(route, self.default_rate)
+            if rate < 1.0 and random.random() >= rate:
+                return False
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(route, [self.rate_limit, now, 0])
+            if not important:
+                bucket[0] = min(self.rate_limit, bucket[0] + (now - bucket[1]) * self.rate_limit)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    bucket[2] += 1
+                    return False
+                bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking the caller."""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; only resolve the message and exception text here
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def _parse_rates(spec):
+    """"/recommend=0.1,/getLikedArticles=0.05" -> {"/recommend": 0.1, "/getLikedArticles": 0.05}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, rate = item.partition("=")
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+def configure_logging():
+    """
+    Route all logging through a queue drained by a background thread, which does the
+    formatting and the (blocking) writes to stdout and LOG_FILE. Idempotent.
+    """
+    global _listener, _queue
+    if _listener is not None:
+        return
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if os.getenv("LOG_FILE", "app.log"):
+        handlers.append(logging.FileHandler(os.getenv("LOG_FILE", "app.log")))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    queue_handler = DroppingQueueHandler(_queue)
+    queue_handler.addFilter(RouteFilter(
+        sample_rates=_parse_rates(os.getenv("LOG_SAMPLE_RATES", "")),
+        default_rate=float(os.getenv("LOG_SAMPLE_DEFAULT", "1.0")),
+        rate_limit=float(os.getenv("LOG_RATE_LIMIT", "50")),
+    ))
+
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def stats():
+    return {
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "dropped": DroppingQueueHandler.dropped,
+    }
+
+
+class RouteContextMiddleware:
+    """ASGI middleware that sets current_route for the duration of each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = current_route.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -0,0 +1,45 @@
+# app/utils/passwords.py
+from app.utils.executor import CpuExecutor
+import bcrypt
+import os
+
+# bcrypt cost factor for new hashes; existing hashes are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt releases the GIL while hashing, so a thread pool runs hashes in parallel
+# without blocking the event loop. Beyond max_pending, callers get ExecutorBusy.
+hash_executor = CpuExecutor(
+    mode="thread",
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None,
+    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64")),
+)
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds))
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password.encode(), hashed)
+
+
+async def hash_password(password, rounds=None):
+    """bcrypt hash (bytes) of password, computed on the hashing pool."""
+    return await hash_executor.run(_hash, password, rounds or BCRYPT_ROUNDS)
+
+
+async def verify_password(password, hashed):
+    if isinstance(hashed, str):
+        hashed = hashed.encode()
+    return await hash_executor.run(_check, password, hashed)
+
+
+def hash_rounds(hashed):
+    """Cost factor of a "$2b$12$..." hash."""
+    if isinstance(hashed, str):
+        hashed = hashed.encode()
+    return int(hashed.split(b"$")[2])
+
+
+def needs_rehash(hashed):
+    return hash_rounds(hashed) != BCRYPT_ROUNDS
@@ -0,0 +1,178 @@
+# app/utils/profiling.py
+from contextvars import ContextVar
+from datetime import datetime
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "x-profile").lower().encode()
+# The header must carry this value to trigger a profile, and to read /ops/profiles; unset
+# disables both (sampled profiles are still written to PROFILE_DIR)
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+_NAME = re.compile(r"^[\w.-]+\.prof$")
+
+# Stage name -> seconds for the current request; None outside a request
+stage_timings = ContextVar("stage_timings", default=None)
+
+# cProfile hooks the whole thread, so only one request is profiled at a time
+_profiling = False
+
+
+class stage:
+    """
+    Context manager adding the time spent in a block to the current request's stage
+    timings (reported in its Server-Timing header). Re-entering a stage accumulates.
+    A no-op outside a request, including inside process-pool workers.
+    """
+
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = stage_timings.get()
+        if self.timings is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timings is not None:
+            self.timings[self.name] = self.timings.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def server_timing(timings, total=None):
+    """Server-Timing header value, e.g. 'fetch;dur=120.4, score;dur=3.1'."""
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def list_profiles():
+    """Saved profiles, newest first."""
+    try:
+        entries = [entry for entry in os.scandir(PROFILE_DIR) if _NAME.match(entry.name)]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [
+        {
+            "name": entry.name,
+            "size": entry.stat().st_size,
+            "created": datetime.fromtimestamp(entry.stat().st_mtime).isoformat(timespec="seconds"),
+        }
+        for entry in entries
+    ]
+
+
+def profile_path(name):
+    """Path of a saved profile, or None if name is not one (never escapes PROFILE_DIR)."""
+    if not _NAME.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def profile_summary(path, limit=40, sort="cumulative"):
+    """Text report of the top functions in a saved profile."""
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def _save(profiler, path):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(path)
+    profiles = list_profiles()
+    for old in profiles[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old["name"]))
+        except OSError:
+            pass
+
+
+def token_matches(value):
+    """Whether value (str or bytes) is the configured PROFILE_TOKEN; never true without one."""
+    if not PROFILE_TOKEN or not value:
+        return False
+    if isinstance(value, str):
+        value = value.encode()
+    return hmac.compare_digest(value, PROFILE_TOKEN.encode())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that collects stage timings for every request and returns them in a
+    Server-Timing header. A PROFILE_SAMPLE_RATE fraction of requests, and requests carrying
+    PROFILE_TOKEN in the PROFILE_HEADER header, also run under cProfile; the profile is written to PROFILE_DIR
+    and its name returned in X-Profile-Id (see /ops/profiles). The profile covers everything
+    the event loop thread runs meanwhile, other requests included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope):
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return token_matches(value)
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        global _profiling
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = {}
+        token = stage_timings.set(timings)
+        start = time.perf_counter()
+
+        profiler = name = None
+        if not _profiling and self._wants_profile(scope):
+            _profiling = True
+            slug = re.sub(r"[^\w]+", "_", scope["path"]).strip("_") or "root"
+            name = f"{datetime.now():%Y%m%d-%H%M%S}-{slug}-{random.randrange(16 ** 6):06x}.prof"
+            profiler = cProfile.Profile()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if timings:
+                    headers.append((b"server-timing", server_timing(timings, time.perf_counter() - start).encode()))
+                if name:
+                    headers.append((b"x-profile-id", name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            if profiler is None:
+                return await self.app(scope, receive, send_with_timing)
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                profiler.disable()
+                _profiling = False
+                try:
+                    # Marshalling the stats is blocking file I/O
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, _save, profiler, os.path.join(PROFILE_DIR, name)
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to save profile {name}: {e!r}")
+        finally:
+            stage_timings.reset(token)
@@ -0,0 +1,35 @@
+# app/utils/result_cache.py
+import hashlib
+import os
+from app.utils.cache import TTLCache
+
+# Latest recommendations per user: email -> (liked-set fingerprint, results).
+# Kept free of the recommender's imports so UserModel can invalidate it cheaply.
+recommendation_cache = TTLCache(
+    maxsize=int(os.getenv("RECOMMEND_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("RECOMMEND_CACHE_TTL", "300")),
+    name="recommendation_cache",
+)
+
+
+def liked_fingerprint(liked_articles):
+    """Order-insensitive digest of the liked titles a recommendation was computed from."""
+    titles = sorted({article["title"].strip().lower() for article in liked_articles})
+    return hashlib.blake2b("\n".join(titles).encode(), digest_size=16).hexdigest()
+
+
+def get_cached_recommendations(email, liked_articles):
+    """Cached results for this user if they were computed from the same liked set, else None."""
+    entry = recommendation_cache.get(email)
+    if entry is not None and entry[0] == liked_fingerprint(liked_articles):
+        return entry[1]
+    return None
+
+
+def cache_recommendations(email, liked_articles, results):
+    recommendation_cache.set(email, (liked_fingerprint(liked_articles), results))
+
+
+def invalidate_user(email):
+    """Drop a user's cached recommendations after their likes change."""
+    recommendation_cache.invalidate(email)
@@ -0,0 +1,120 @@
+# app/utils/startup.py
+from contextlib import contextmanager
+import importlib.abc
+import sys
+import threading
+import time
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Records how long each module takes to import while installed: an in-process
+    `python -X importtime`. Cumulative time includes the module's own imports;
+    self time excludes them. Imports on other threads (the warm-up) are timed too.
+    """
+
+    def __init__(self):
+        self.modules = {}  # name -> (cumulative seconds, self seconds, top-level)
+        self._local = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        # Built-in and frozen importers are shared classes; their modules are cheap anyway
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        if not getattr(loader.exec_module, "_timed", False):
+            try:
+                loader.exec_module = self._timed(loader.exec_module)
+            except (AttributeError, TypeError):
+                pass  # a loader that takes no attributes; its module just goes untimed
+        return spec
+
+    def _timed(self, exec_module):
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)  # time spent in nested imports
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                self.modules[module.__name__] = (elapsed, elapsed - nested, not stack)
+                if stack:
+                    stack[-1] += elapsed
+        timed_exec_module._timed = True
+        return timed_exec_module
+
+    def report(self, top=15):
+        top_level = [(name, cumulative) for name, (cumulative, _, is_top) in self.modules.items() if is_top]
+        by_self = sorted(self.modules.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "modules": len(self.modules),
+            "total_ms": round(sum(cumulative for _, cumulative in top_level) * 1000, 1),
+            "top_level_ms": {
+                name: round(cumulative * 1000, 1)
+                for name, cumulative in sorted(top_level, key=lambda item: item[1], reverse=True)[:top]
+            },
+            "slowest_self_ms": {name: round(own * 1000, 1) for name, (_, own, _) in by_self},
+        }
+
+
+class Startup:
+    """
+    Startup progress of this worker: how long each phase took, the import breakdown, and
+    the readiness flag /ops/ready gates on, flipped once the post-bind warm-up is done.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = ImportTimer()
+        self.phases = {}
+        self.ready = False
+        self.ready_after = None
+        self.error = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def mark(self, name):
+        """Record a phase that began when startup did (e.g. importing the app)."""
+        self.phases[name] = round((time.perf_counter() - self.started) * 1000, 1)
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_after = round((time.perf_counter() - self.started) * 1000, 1)
+        # Later lazy imports are off the startup path; stop paying for the hook
+        self.imports.uninstall()
+
+    def report(self, top=15):
+        return {
+            "ready": self.ready,
+            "ready_after_ms": self.ready_after,
+            "error": self.error,
+            "phases_ms": self.phases,
+            "imports": self.imports.report(top),
+        }
+
+
+startup_state = Startup()
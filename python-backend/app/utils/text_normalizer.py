@@ -0,0 +1,113 @@
+# app/utils/text_normalizer.py
+from itertools import filterfalse
+import re
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+# The ASCII characters _PUNCTUATION removes, as a str.translate deletion table.
+# translate() over one large ASCII string is an order of magnitude faster than the regex.
+_ASCII_PUNCTUATION = {c: None for c in range(128) if _PUNCTUATION.match(chr(c))}
+
+
+class TextNormalizer:
+    """
+    Title normalization shared by ingestion and scoring.
+    normalize() matches RecommendationService._preprocess_text and query_terms()
+    matches _sanitize_query. Normalized titles are memoized in a bounded table
+    (oldest entries dropped first) because the same headlines recur constantly.
+    """
+
+    def __init__(self, stop_words, cache_size=50000):
+        self.stop_words = frozenset(stop_words)
+        self.cache_size = cache_size
+        self._memo = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, text, normalized):
+        memo = self._memo
+        if len(memo) >= self.cache_size:
+            try:
+                del memo[next(iter(memo))]
+            except (KeyError, RuntimeError, StopIteration):
+                pass
+        memo[text] = normalized
+
+    def normalize(self, text):
+        """Lowercase, strip punctuation and drop stop words."""
+        normalized = self._memo.get(text)
+        if normalized is None:
+            self.misses += 1
+            words = _PUNCTUATION.sub("", text.lower()).split()
+            normalized = " ".join(filterfalse(self.stop_words.__contains__, words))
+            self._remember(text, normalized)
+        else:
+            self.hits += 1
+        return normalized
+
+    def normalize_batch(self, texts):
+        """
+        Normalize many titles at once. Cache misses are lowercased and stripped of
+        punctuation as one joined string instead of one regex call per title.
+        """
+        texts = list(texts)
+        results = [None] * len(texts)
+        memo = self._memo
+        missing = []
+        for i, text in enumerate(texts):
+            normalized = memo.get(text)
+            if normalized is None:
+                missing.append(i)
+            else:
+                results[i] = normalized
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if not missing:
+            return results
+
+        # Pure-ASCII titles go through the fast translate() path, the rest through the regex
+        ascii_rows = [i for i in missing if texts[i].isascii()]
+        other_rows = [i for i in missing if not texts[i].isascii()] if len(ascii_rows) < len(missing) else []
+        lines = self._clean_lines(texts, ascii_rows, lambda blob: blob.translate(_ASCII_PUNCTUATION))
+        lines += self._clean_lines(texts, other_rows, lambda blob: _PUNCTUATION.sub("", blob))
+
+        is_stop_word = self.stop_words.__contains__
+        for i, line in zip(ascii_rows + other_rows, lines):
+            normalized = " ".join(filterfalse(is_stop_word, line.split()))
+            results[i] = normalized
+            self._remember(texts[i], normalized)
+        return results
+
+    @staticmethod
+    def _clean_lines(texts, rows, strip_punctuation):
+        if not rows:
+            return []
+        # "\n" is whitespace to the regex and to split(), so it is a safe line separator
+        blob = "\n".join([texts[i].replace("\n", " ") for i in rows])
+        return strip_punctuation(blob.lower()).split("\n")
+
+    def query_terms(self, text, max_terms=3):
+        """Up to max_terms ASCII key terms (longer than 2 chars, not stop words) for a NewsAPI query."""
+        if not text.isascii():
+            text = _NON_ASCII.sub("", text)
+        words = _PUNCTUATION.sub(" ", text).split()
+        stop_words = self.stop_words
+        terms = []
+        for w in words:
+            if len(w) > 2 and w not in stop_words:
+                terms.append(w)
+                if len(terms) == max_terms:
+                    break
+        if terms:
+            return " ".join(terms)
+        return words[0] if words else ""
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._memo),
+            "maxsize": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
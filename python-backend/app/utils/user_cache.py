@@ -0,0 +1,11 @@
+# app/utils/user_cache.py
+import os
+from app.utils.cache import TTLCache
+
+# email -> user record without secrets (see UserModel.get_user_profile).
+# Per worker, so other workers may serve a changed record for up to the TTL.
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+    name="user_cache",
+)
@@ -0,0 +1,111 @@
+"""
+Microbenchmark: per-request cost of the candidate container used by /recommend.
+
+Compares the previous pandas path (one DataFrame over the fetched pages, drop_duplicates,
+.apply, to_dict("records") and per-row dicts) with CandidatePool. Vectorization is
+excluded: both paths rank the same precomputed score matrix with
+scoring.rank, so the numbers isolate container allocation and copying.
+
+    cd python-backend
+    python -m benchmarks.bench_candidate_pool --likes 10 --page-size 50
+
+pandas is only needed to run the baseline side of this benchmark.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from app.services import scoring
+from app.services.candidates import CandidatePool
+from app.services.recommend_service import RecommendationService
+
+WORDS = (
+    "election market storm football climate vaccine rocket bank court senate energy chip "
+    "startup tariff drought inflation merger satellite protest summit wildfire"
+).split()
+
+
+def make_pages(likes, page_size, seed=0):
+    rnd = random.Random(seed)
+    return [
+        [
+            {
+                "title": " ".join(rnd.choice(WORDS) for _ in range(8)).title() + "!",
+                "description": "Synthetic description",
+                "url": f"https://example.com/{page}/{i}",
+                "urlToImage": "",
+                "source": {"name": "Example"},
+                "publishedAt": "2024-01-01T00:00:00Z",
+            }
+            for i in range(page_size)
+        ]
+        for page in range(likes)
+    ]
+
+
+def dataframe_path(service, pages, scores, liked_titles):
+    df = pd.DataFrame([service._process_article(a) for page in pages for a in page])
+    df = df[df["title"].notna()].drop_duplicates("url")
+    df["processed_text"] = df["title"].apply(service._preprocess_text)
+    candidates = df.to_dict("records")
+    exclude = np.fromiter(
+        (c["title"].strip().lower() in liked_titles for c in candidates), dtype=bool, count=len(candidates)
+    )
+    rows = scoring.rank(scores, 5 * len(pages), exclude=exclude)
+    fields = ("title", "description", "url", "urlToImage", "source", "publishedAt")
+    return [{key: candidates[row][key] for key in fields} for row in rows]
+
+
+def pool_path(service, pages, scores, liked_titles):
+    pool = CandidatePool.from_articles(
+        (service._process_article(a) for page in pages for a in page), preprocess=service._preprocess_batch
+    )
+    rows = scoring.rank(scores, 5 * len(pages), exclude=pool.exclude_mask(liked_titles))
+    return pool.to_records(rows)
+
+
+def measure(fn, service, pages, scores, liked_titles, repeat):
+    fn(service, pages, scores, liked_titles)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(service, pages, scores, liked_titles)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(service, pages, scores, liked_titles)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.median(timings) * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--likes", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    service = RecommendationService()
+    pages = make_pages(args.likes, args.page_size)
+    liked_titles = {"senate election storm"}
+    scores = np.random.default_rng(0).random((sum(len(p) for p in pages), args.likes), dtype=np.float32)
+
+    print(f"{args.likes} likes x {args.page_size} candidates, median of {args.repeat} runs")
+    results = {}
+    for name, fn in (("dataframe", dataframe_path), ("candidate_pool", pool_path)):
+        ms, peak_kib = measure(fn, service, pages, scores, liked_titles, args.repeat)
+        results[name] = (ms, peak_kib)
+        print(f"  {name:<15} {ms:8.2f} ms/request   peak alloc {peak_kib:9.1f} KiB")
+
+    base_ms, base_kib = results["dataframe"]
+    new_ms, new_kib = results["candidate_pool"]
+    print(f"  speedup {base_ms / new_ms:.1f}x, allocation {base_kib / new_kib:.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
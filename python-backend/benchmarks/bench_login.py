@@ -0,0 +1,90 @@
+"""
+Benchmark: login throughput and event-loop responsiveness under concurrent logins.
+
+Simulates the /login handler (a short awaited user lookup, then a bcrypt check)
+for a burst of concurrent logins, once with bcrypt.checkpw called directly on the
+event loop (the original code) and once through app.utils.passwords, which runs it
+on the bounded hashing pool. A ticker task measures how late the event loop wakes
+up while the burst runs, which is the delay every other request on the worker sees.
+
+    cd python-backend
+    python -m benchmarks.bench_login --logins 200 --concurrency 50 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import bcrypt
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+async def ticker(lags, stop, interval=0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def run_burst(check, hashed, logins, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def login():
+        async with semaphore:
+            start = time.perf_counter()
+            await asyncio.sleep(0.002)  # user lookup
+            assert await check("correct horse", hashed)
+            latencies.append(time.perf_counter() - start)
+
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed, latencies, lags
+
+
+def report(label, logins, elapsed, latencies, lags):
+    print(
+        f"  {label:<22} {logins / elapsed:8.1f} logins/s   p50 {percentile(latencies, 50) * 1000:7.1f} ms   "
+        f"p95 {percentile(latencies, 95) * 1000:7.1f} ms   loop lag p95 {percentile(lags, 95) * 1000:7.1f} ms "
+        f"max {max(lags) * 1000:7.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=0, help="hashing pool size (default: CPU count)")
+    args = parser.parse_args()
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(args.logins)
+    from app.utils.passwords import hash_executor, verify_password
+
+    hashed = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(args.rounds))
+    print(
+        f"{args.logins} logins, {args.concurrency} concurrent, bcrypt cost {args.rounds}, "
+        f"{os.cpu_count()} CPUs, pool of {hash_executor.max_workers}"
+    )
+
+    async def blocking_check(password, hashed):
+        return bcrypt.checkpw(password.encode(), hashed)
+
+    report("checkpw on event loop", args.logins, *await run_burst(blocking_check, hashed, args.logins, args.concurrency))
+    report("hashing pool", args.logins, *await run_burst(verify_password, hashed, args.logins, args.concurrency))
+    hash_executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark: RandomProjectionLSH recall@k and query throughput against exact search.
+
+Builds synthetic clustered corpora of L2-normalized vectors (one per corpus size),
+computes the exact top-k for a set of queries with a full matrix product plus
+argpartition, then reports, for each n_tables/n_bits/n_probes setting, recall@k,
+average shortlist size, build time and queries per second next to exact search.
+
+    cd python-backend
+    python -m benchmarks.bench_lsh --sizes 100000 1000000 --dim 128
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.lsh_index import RandomProjectionLSH
+
+
+def make_corpus(n, dim, clusters, seed=0):
+    """Vectors scattered around random cluster centres, like topic-grouped headlines."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    step = 100000
+    for start in range(0, n, step):
+        end = min(start + step, n)
+        labels = rng.integers(0, clusters, size=end - start)
+        vectors[start:end] = centres[labels] + 0.6 * rng.standard_normal((end - start, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def make_queries(corpus, n, seed=1):
+    """Perturbed corpus vectors, so each query has genuine close neighbours."""
+    rng = np.random.default_rng(seed)
+    queries = corpus[rng.integers(0, len(corpus), size=n)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(corpus.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus, queries, k):
+    """Top-k ids per query by brute force; returns (ids, seconds per query)."""
+    start = time.perf_counter()
+    top = []
+    for query in queries:
+        scores = corpus @ query
+        top.append(np.argpartition(-scores, k - 1)[:k])
+    return top, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--tables", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--bits", type=int, nargs="+", default=[10, 12, 14])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+    k = args.k
+
+    for n in args.sizes:
+        corpus = make_corpus(n, args.dim, args.clusters)
+        queries = make_queries(corpus, args.queries)
+        truth, exact_seconds = exact_top_k(corpus, queries, k)
+        print(f"{n} vectors, dim {args.dim}, k={k}: exact {1 / exact_seconds:8.1f} qps")
+        print(f"  {'tables':>6} {'bits':>4} {'probes':>6} {'build s':>8} {'recall':>7} {'shortlist':>9} {'qps':>9} {'speedup':>8}")
+        ids = np.arange(n, dtype=np.int64)
+        for n_tables in args.tables:
+            for n_bits in args.bits:
+                index = RandomProjectionLSH(args.dim, n_tables=n_tables, n_bits=n_bits)
+                start = time.perf_counter()
+                index.insert(ids, corpus)
+                build = time.perf_counter() - start
+                for n_probes in args.probes:
+                    hits = 0
+                    shortlist = 0
+                    start = time.perf_counter()
+                    for query, expected in zip(queries, truth):
+                        found, _ = index.query(query, k, corpus.__getitem__, n_probes=n_probes)
+                        hits += len(np.intersect1d(found, expected))
+                    seconds = (time.perf_counter() - start) / len(queries)
+                    for query in queries[:20]:
+                        shortlist += len(index.candidates(query, n_probes=n_probes))
+                    print(
+                        f"  {n_tables:>6} {n_bits:>4} {n_probes:>6} {build:>8.2f} {hits / (k * len(queries)):>7.3f} "
+                        f"{shortlist / 20:>9.0f} {1 / seconds:>9.1f} {exact_seconds / seconds:>7.1f}x"
+                    )
+                del index
+
+
+if __name__ == "__main__":
+    main()
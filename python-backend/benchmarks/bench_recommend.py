@@ -0,0 +1,227 @@
+"""
+Benchmark: end-to-end RecommendationService.get_recommendations, offline.
+
+For every liked-list size x candidate pool size it measures wall time (median, p95),
+the per-stage split (fetch, preprocess, vectorize, score, rank; the same timers that
+feed the Server-Timing header) and peak traced memory, on one or both paths:
+
+  live    cold start: each liked title is fetched from a fake NewsAPI (see
+          benchmarks/fake_newsapi.py) serving pool/liked articles per page, with the
+          configured latency and 429 rate, then scored with TF-IDF.
+  corpus  a local corpus of pool synthetic articles, vectorized into a temporary
+          vector store (LSH kicks in from LSH_MIN_CORPUS articles).
+
+The NewsAPI response cache is cleared before every run so each one pays for its
+fetches. Results are written as JSON (--output) for tracking regressions; a summary
+table goes to stdout, or to stderr when the JSON does (--output -).
+
+    cd python-backend
+    python -m benchmarks.bench_recommend --liked 1 10 100 --pool 50 1000 10000 100000 \\
+        --latency 0.05 --rate-429 0.05 --output bench-recommend.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.fake_newsapi import WORDS, FakeNewsAPI, synthetic_article
+
+STAGES = ("fetch", "preprocess", "vectorize", "score", "rank")
+
+
+def liked_titles(n, seed=0):
+    """n distinct headline-like titles."""
+    rnd = np.random.default_rng(seed)
+    titles = []
+    while len(titles) < n:
+        title = " ".join(rnd.choice(WORDS, size=3))
+        if title not in titles:
+            titles.append(title)
+    return [{"title": title, "category": "general"} for title in titles]
+
+
+def make_service(workdir, name, corpus_size):
+    # RecommendationService reads its paths and sizes from the environment when constructed
+    os.environ["VECTOR_STORE_DIR"] = os.path.join(workdir, name, "vectors")
+    os.environ["VECTORIZER_PATH"] = os.path.join(workdir, name, "vectorizer.npz")
+    os.environ["CORPUS_MAX_ARTICLES"] = str(max(corpus_size, 1))
+    from app.services.recommend_service import RecommendationService
+    return RecommendationService()
+
+
+def fill_corpus(service, size, seed=0):
+    """Ingest size synthetic articles the way IngestionService does, minus MongoDB."""
+    rnd = random.Random(seed)
+    articles = [service._process_article(synthetic_article(rnd, rnd.choice(WORDS), i)) for i in range(size)]
+    for i, article in enumerate(articles):
+        article["url"] = f"https://corpus.example.com/{i}"
+    processed = service._preprocess_batch([a["title"] for a in articles])
+    for article, text in zip(articles, processed):
+        article["processed_text"] = text
+    service.vector_store.acquire_writer()
+    service.corpus.add(articles)
+    service.corpus.reindex()
+
+
+async def run_once(service, liked, top_k):
+    from app.utils.profiling import stage_timings
+    timings = {}
+    token = stage_timings.set(timings)
+    service.news_cache.clear()
+    try:
+        start = time.perf_counter()
+        results = await service.get_recommendations(liked, top_k=top_k)
+        return time.perf_counter() - start, timings, len(results)
+    finally:
+        stage_timings.reset(token)
+
+
+async def measure(service, liked, repeat, top_k):
+    await run_once(service, liked, top_k)  # warm-up: thread pool, normalizer memo, imports
+    walls, stage_runs, n_results = [], [], 0
+    for _ in range(repeat):
+        wall, timings, n_results = await run_once(service, liked, top_k)
+        walls.append(wall)
+        stage_runs.append(timings)
+
+    tracemalloc.start()
+    await run_once(service, liked, top_k)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    walls = np.array(walls) * 1000
+    stages = {
+        name: round(float(np.median([run.get(name, 0.0) for run in stage_runs]) * 1000), 3) for name in STAGES
+    }
+    return {
+        "wall_ms_median": round(float(np.median(walls)), 3),
+        "wall_ms_p95": round(float(np.percentile(walls, 95)), 3),
+        "wall_ms_min": round(float(walls.min()), 3),
+        "stages_ms_median": stages,
+        "peak_traced_kib": round(peak / 1024, 1),
+        "results": n_results,
+    }
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "benchmark": "bench_recommend",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "executor": os.getenv("RECOMMEND_EXECUTOR", "thread"),
+        "args": vars(args),
+    }
+
+
+def print_row(out, result):
+    if result.get("skipped"):
+        print(f"  {result['path']:<7} liked {result['liked']:>4}  pool {result['pool']:>7}  skipped: {result['skipped']}", file=out)
+        return
+    stages = "  ".join(f"{name} {result['stages_ms_median'][name]:8.1f}" for name in STAGES)
+    print(
+        f"  {result['path']:<7} liked {result['liked']:>4}  pool {result['pool']:>7}  "
+        f"median {result['wall_ms_median']:9.1f} ms  p95 {result['wall_ms_p95']:9.1f} ms  "
+        f"peak {result['peak_traced_kib'] / 1024:7.1f} MiB  | {stages}",
+        file=out,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--liked", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--pool", type=int, nargs="+", default=[50, 1000, 10000, 100000])
+    parser.add_argument("--paths", nargs="+", choices=("live", "corpus"), default=["live", "corpus"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=None, help="default: 5 per liked title, as the service does")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake NewsAPI latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of fake NewsAPI calls answered 429")
+    parser.add_argument("--recorded", help="JSON file of recorded NewsAPI articles to serve instead of synthetic ones")
+    parser.add_argument("--max-page-size", type=int, default=1000,
+                        help="skip live cases needing larger pages than this per liked title")
+    parser.add_argument("--executor", choices=("thread", "process", "inline"), help="RECOMMEND_EXECUTOR override")
+    parser.add_argument("--output", help="write JSON results here ('-' for stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    if args.executor:
+        os.environ["RECOMMEND_EXECUTOR"] = args.executor
+    from app.utils import http_client
+
+    out = sys.stderr if args.output == "-" else sys.stdout
+    fake = FakeNewsAPI(latency=args.latency, jitter=args.jitter, rate_429=args.rate_429, recorded=args.recorded)
+    http_client.client = fake.client()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-recommend-") as workdir:
+        if "live" in args.paths:
+            print(f"live path: fake NewsAPI latency {args.latency * 1000:.0f} ms, 429 rate {args.rate_429:.0%}", file=out)
+            service = make_service(workdir, "live", 0)
+            for liked in args.liked:
+                for pool in args.pool:
+                    page_size = math.ceil(pool / liked)
+                    result = {"path": "live", "liked": liked, "pool": pool, "page_size": page_size}
+                    if page_size > args.max_page_size:
+                        result["skipped"] = f"needs {page_size} articles per page (--max-page-size {args.max_page_size})"
+                    else:
+                        fake.page_size = page_size
+                        fake.reset_counts()
+                        result.update(await measure(service, liked_titles(liked), args.repeat, args.top_k))
+                        runs = args.repeat + 2
+                        result["newsapi_calls_per_run"] = round(fake.calls / runs, 2)
+                        result["newsapi_429_per_run"] = round(fake.rate_limited / runs, 2)
+                    results.append(result)
+                    print_row(out, result)
+            service.executor.shutdown()
+
+        if "corpus" in args.paths:
+            print("corpus path", file=out)
+            for pool in args.pool:
+                service = make_service(workdir, f"corpus-{pool}", pool)
+                start = time.perf_counter()
+                fill_corpus(service, pool)
+                build_s = time.perf_counter() - start
+                for liked in args.liked:
+                    result = {
+                        "path": "corpus", "liked": liked, "pool": pool, "corpus_build_s": round(build_s, 3),
+                        "lsh": service.corpus.index is not None and pool >= service.lsh_min_corpus,
+                    }
+                    result.update(await measure(service, liked_titles(liked), args.repeat, args.top_k))
+                    results.append(result)
+                    print_row(out, result)
+                service.executor.shutdown()
+
+    await http_client.close_http_client()
+    report = {"meta": metadata(args), "results": results}
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}", file=out)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
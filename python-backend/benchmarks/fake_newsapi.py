@@ -0,0 +1,109 @@
+"""
+Offline stand-in for NewsAPI's /v2/everything, served through an httpx transport.
+
+Pages are synthetic (deterministic per query and seed, and mentioning the query so
+scoring has real signal) or cut from a recorded file: a NewsAPI response
+({"articles": [...]}), a list of responses, or a plain list of articles. Latency,
+jitter and the fraction of 429 responses are configurable. Used by the benchmarks:
+
+    from benchmarks.fake_newsapi import FakeNewsAPI
+    fake = FakeNewsAPI(page_size=50, latency=0.05, rate_429=0.1)
+    http_client.client = fake.client()
+"""
+import asyncio
+import json
+import random
+import zlib
+
+import httpx
+
+WORDS = (
+    "election market storm football climate vaccine rocket bank court senate energy chip "
+    "startup tariff drought inflation merger satellite protest summit wildfire budget "
+    "strike harvest airline pipeline museum festival reactor telescope"
+).split()
+
+
+def synthetic_article(rnd, query, i):
+    words = [rnd.choice(WORDS) for _ in range(rnd.randint(5, 10))]
+    # Most articles mention the query, as NewsAPI's matches do
+    if rnd.random() < 0.8:
+        words.insert(rnd.randrange(len(words) + 1), query)
+    return {
+        "source": {"id": None, "name": rnd.choice(("Reuters", "AP", "BBC News", "The Verge"))},
+        "author": "Staff",
+        "title": " ".join(words).capitalize(),
+        "description": " ".join(rnd.choice(WORDS) for _ in range(20)),
+        "url": f"https://news.example.com/{zlib.crc32(query.encode())}/{i}",
+        "urlToImage": f"https://news.example.com/img/{i}.jpg",
+        "publishedAt": f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T12:00:00Z",
+        "content": "Synthetic content",
+    }
+
+
+def load_recorded(path):
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    articles = []
+    for item in data:
+        articles.extend(item.get("articles", []) if isinstance(item, dict) else [item])
+    if not articles:
+        raise ValueError(f"No articles in {path}")
+    return articles
+
+
+class FakeNewsAPI:
+    """
+    :param page_size: Articles per response (NewsAPI's own pageSize param is ignored,
+                      so benchmarks can grow the candidate pool past its cap).
+    :param latency: Seconds before each response, plus up to jitter seconds more.
+    :param rate_429: Fraction of requests answered with 429 Too Many Requests.
+    :param recorded: Path of recorded articles to serve instead of synthetic ones.
+    """
+
+    def __init__(self, page_size=50, latency=0.05, jitter=0.0, rate_429=0.0, recorded=None, seed=0):
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.recorded = load_recorded(recorded) if recorded else None
+        self.seed = seed
+        self._rnd = random.Random(seed)
+        self.calls = 0
+        self.rate_limited = 0
+
+    def reset_counts(self):
+        self.calls = 0
+        self.rate_limited = 0
+
+    def page(self, query):
+        rnd = random.Random(f"{self.seed}:{query}")
+        if self.recorded:
+            # A rotating slice; urls are made unique per query so pages larger than the recording still dedupe right
+            start = rnd.randrange(len(self.recorded))
+            tag = zlib.crc32(query.encode())
+            return [
+                {**self.recorded[(start + i) % len(self.recorded)], "url": f"https://news.example.com/{tag}/{i}"}
+                for i in range(self.page_size)
+            ]
+        return [synthetic_article(rnd, query, i) for i in range(self.page_size)]
+
+    async def handle(self, request):
+        self.calls += 1
+        delay = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.rate_429 and self._rnd.random() < self.rate_429:
+            self.rate_limited += 1
+            return httpx.Response(429, json={"status": "error", "code": "rateLimited"})
+        articles = self.page(request.url.params.get("q", ""))
+        return httpx.Response(200, json={"status": "ok", "totalResults": len(articles), "articles": articles})
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
+
+    def client(self):
+        """An AsyncClient to install as app.utils.http_client.client."""
+        return httpx.AsyncClient(transport=self.transport())
@@ -0,0 +1,371 @@
+"""
+Load test: drive app.main:app over HTTP with a realistic mix of user requests.
+
+Boots the app under uvicorn (--workers N) with NewsAPI replaced by the offline fake
+(benchmarks/fake_newsapi.py) and MongoDB by one of:
+
+  mongomock  an in-memory motor-compatible fake (needs mongomock-motor; one worker
+             only, since every worker process would get its own empty database)
+  mongod     a throwaway local mongod on a temporary dbpath (needs mongod on PATH)
+  <uri>      an existing server, e.g. mongodb://localhost:27017 (use a scratch database)
+
+The default, auto, picks mongomock when installed and mongod otherwise.
+
+It registers --users accounts, then runs --concurrency virtual users for --duration
+seconds, each picking a route by the --mix weights and waiting for the response before
+sending the next request (a closed loop). Requests in the first --warmup seconds
+are not counted. Reports throughput, p50/p95/p99 latency and error rate per route,
+plus the server's /ops/runtime snapshot (executor queues, rejections, loop lag),
+optionally as JSON (--output).
+
+--transport asgi skips uvicorn and sockets and calls the app in this process, which
+is handy for checking the harness but shares one event loop between load and app.
+The load generator always shares the host's CPUs with the server, so on a small box
+leave headroom or read the numbers as relative.
+
+    cd python-backend
+    python -m benchmarks.load_test --concurrency 32 --duration 60 --workers 1 \\
+        --mix login=1,likeArticle=3,getLikedArticles=4,recommend=2 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+from benchmarks.fake_newsapi import WORDS, FakeNewsAPI
+
+PASSWORD = "load-test-password"
+DEFAULT_MIX = "login=1,likeArticle=3,getLikedArticles=4,recommend=2"
+
+
+def install_standins():
+    """
+    Point the app at the stand-ins chosen through LOADTEST_* environment variables.
+    Runs in the server process (or each uvicorn worker) before the app starts.
+    """
+    if os.getenv("LOADTEST_MONGO") == "mongomock":
+        import mongomock_motor
+        from app.config import db
+        db.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    from app.utils import http_client
+    http_client.client = FakeNewsAPI(
+        page_size=int(os.getenv("LOADTEST_NEWSAPI_PAGE_SIZE", "50")),
+        latency=float(os.getenv("LOADTEST_NEWSAPI_LATENCY", "0.05")),
+        rate_429=float(os.getenv("LOADTEST_NEWSAPI_429", "0")),
+    ).client()
+
+
+def serve_app():
+    """uvicorn app factory: benchmarks.load_test:serve_app --factory"""
+    install_standins()
+    from app.main import app
+    return app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mongod(workdir):
+    port = free_port()
+    process = subprocess.Popen(
+        ["mongod", "--dbpath", workdir, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL,
+    )
+    return process, f"mongodb://127.0.0.1:{port}"
+
+
+def start_server(port, workers, log_path):
+    """uvicorn in a subprocess; its stderr goes to log_path (see log_tail)."""
+    with open(log_path, "wb") as log:
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "benchmarks.load_test:serve_app", "--factory",
+                "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+            ],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stderr=log,
+        )
+
+
+def log_tail(path, lines=20):
+    try:
+        with open(path, errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+
+async def wait_ready(client, timeout, process=None, log_path=None):
+    """
+    Poll /ops/ready until the app has warmed up and MongoDB answers (the port is bound
+    before that). Fails fast, with the server's last stderr lines, if process exits.
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(
+                f"Server exited with code {process.returncode} before it was ready:\n{log_tail(log_path) if log_path else ''}"
+            )
+        try:
+            if (await client.get("/ops/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"Server not ready after {timeout}s")
+        await asyncio.sleep(0.2)
+
+
+def parse_mix(spec):
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown route in --mix: {name} (known: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def random_title(rnd):
+    return " ".join(rnd.choice(WORDS) for _ in range(3)).capitalize()
+
+
+# Route name -> (path, request body for a user)
+OPERATIONS = {
+    "login": ("/login", lambda user, rnd: {"email": user, "password": PASSWORD}),
+    "likeArticle": ("/likeArticle", lambda user, rnd: {
+        "email": user, "articleTitle": random_title(rnd), "articleCategory": rnd.choice(("general", "tech", "sport")),
+    }),
+    "unlikeArticle": ("/unlikeArticle", lambda user, rnd: {"email": user, "articleTitle": random_title(rnd)}),
+    "getLikedArticles": ("/getLikedArticles", lambda user, rnd: {"email": user}),
+    "getUserDetails": ("/getUserDetails", lambda user, rnd: {"email": user}),
+    "recommend": ("/recommend", lambda user, rnd: {"email": user}),
+}
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = Counter()
+
+    def record(self, seconds, status, ok):
+        self.latencies.append(seconds)
+        self.statuses[str(status)] += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        latencies = np.array(self.latencies) * 1000
+        p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0.0, 0.0, 0.0)
+        return {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2) if len(latencies) else 0.0,
+            "error_rate": round(self.errors / len(latencies), 4) if len(latencies) else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+async def register_users(client, count, concurrency):
+    users = [f"loadtest{i}@example.com" for i in range(count)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register(i, email):
+        async with semaphore:
+            response = await client.post("/registration", json={
+                "email": email, "password": PASSWORD, "username": f"loadtest{i}", "phone": f"+1555{i:07d}",
+            })
+            # 400: already registered by an earlier run against the same database
+            if response.status_code not in (200, 400):
+                raise RuntimeError(f"Registering {email} failed: {response.status_code} {response.text}")
+
+    await asyncio.gather(*(register(i, email) for i, email in enumerate(users)))
+    return users
+
+
+async def virtual_user(client, mix, users, warmup_end, end, stats, seed):
+    rnd = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < end:
+        name = rnd.choices(names, weights)[0]
+        path, body = OPERATIONS[name]
+        payload = body(rnd.choice(users), rnd)
+        sent = time.perf_counter()
+        try:
+            response = await client.post(path, json=payload)
+            status, ok = response.status_code, response.status_code < 400
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        if sent >= warmup_end:
+            stats[name].record(time.perf_counter() - sent, status, ok)
+
+
+async def run_load(client, args):
+    mix = parse_mix(args.mix)
+    users = await register_users(client, args.users, args.concurrency)
+    stats = defaultdict(RouteStats)
+    warmup_end = time.perf_counter() + args.warmup
+    end = warmup_end + args.duration
+    await asyncio.gather(*(
+        virtual_user(client, mix, users, warmup_end, end, stats, seed)
+        for seed in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - warmup_end
+    routes = {name: stats[name].summary(elapsed) for name in mix}
+    overall = RouteStats()
+    for route in stats.values():
+        overall.latencies.extend(route.latencies)
+        overall.errors += route.errors
+        overall.statuses.update(route.statuses)
+    try:
+        runtime = (await client.get("/ops/runtime")).json()
+    except (httpx.HTTPError, ValueError):
+        runtime = None
+    return {"routes": routes, "overall": overall.summary(elapsed), "server_runtime": runtime}
+
+
+def print_report(report, out):
+    print(f"  {'route':<18} {'req':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}", file=out)
+    for name, route in list(report["routes"].items()) + [("overall", report["overall"])]:
+        print(
+            f"  {name:<18} {route['requests']:>7} {route['throughput_rps']:>8.1f} {route['p50_ms']:>9.1f} "
+            f"{route['p95_ms']:>9.1f} {route['p99_ms']:>9.1f} {route['error_rate']:>8.2%}",
+            file=out,
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", default="auto", help="auto, mongomock, mongod or a mongodb:// URI")
+    parser.add_argument("--transport", choices=("http", "asgi"), default="http")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run before measuring")
+    parser.add_argument("--users", type=int, default=50, help="accounts registered before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route=weight list (routes: {', '.join(OPERATIONS)})")
+    parser.add_argument("--newsapi-latency", type=float, default=0.05)
+    parser.add_argument("--newsapi-429", type=float, default=0.0)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="BCRYPT_ROUNDS for the server")
+    parser.add_argument("--ingest", action="store_true",
+                        help="let the ingestion loop fill the local corpus (from the fake NewsAPI) before the run")
+    parser.add_argument("--ready-timeout", type=float, default=60)
+    parser.add_argument("--output", help="write JSON results here ('-' for stdout)")
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    mongo = args.mongo
+    if mongo == "auto":
+        try:
+            import mongomock_motor  # noqa: F401
+            mongo = "mongomock"
+        except ImportError:
+            if not shutil.which("mongod"):
+                raise SystemExit("Neither mongomock-motor nor mongod is available; pass --mongo <uri>")
+            mongo = "mongod"
+    if mongo == "mongomock" and args.workers > 1:
+        raise SystemExit("mongomock gives every worker its own database; use --mongo mongod or a URI for --workers > 1")
+
+    out = sys.stderr if args.output == "-" else sys.stdout
+    processes = []
+    server = server_log = None
+    with tempfile.TemporaryDirectory(prefix="load-test-") as workdir:
+        env = {
+            "LOADTEST_NEWSAPI_LATENCY": str(args.newsapi_latency),
+            "LOADTEST_NEWSAPI_429": str(args.newsapi_429),
+            "INGEST_ENABLED": "true" if args.ingest else "false",
+            "INGEST_INTERVAL": "3600",
+            "VECTOR_STORE_DIR": os.path.join(workdir, "vectors"),
+            "VECTORIZER_PATH": os.path.join(workdir, "vectorizer.npz"),
+            "PROFILE_DIR": os.path.join(workdir, "profiles"),
+            "LOG_FILE": "",
+            "LOG_LEVEL": "WARNING",
+        }
+        if args.bcrypt_rounds:
+            env["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+        try:
+            if mongo == "mongomock":
+                env["LOADTEST_MONGO"] = "mongomock"
+            else:
+                if mongo == "mongod":
+                    os.makedirs(os.path.join(workdir, "db"))
+                    process, mongo = start_mongod(os.path.join(workdir, "db"))
+                    processes.append(process)
+                env["MONGO_URI"] = mongo
+                env["MONGO_DB_NAME"] = os.getenv("MONGO_DB_NAME", "loadtest")
+            os.environ.update(env)
+
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            if args.transport == "asgi":
+                app = serve_app()
+                await app.router.startup()
+                client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=60)
+            else:
+                port = free_port()
+                server_log = os.path.join(workdir, "server.log")
+                server = start_server(port, args.workers, server_log)
+                processes.append(server)
+                client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60)
+
+            async with client:
+                await wait_ready(client, args.ready_timeout, server, server_log)
+                print(
+                    f"{args.transport} transport, {args.workers} worker(s), mongo {args.mongo if args.mongo != 'auto' else mongo}, "
+                    f"{args.concurrency} virtual users, {args.duration:.0f}s after {args.warmup:.0f}s warm-up",
+                    file=out,
+                )
+                report = await run_load(client, args)
+            if args.transport == "asgi":
+                await app.router.shutdown()
+        finally:
+            # A server that died on its own has had its stderr reported by wait_ready
+            crashed = server is not None and server.poll() is not None
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if server_log and not crashed and log_tail(server_log):
+                print(f"server stderr (last lines):\n{log_tail(server_log)}", file=sys.stderr)
+
+    print_report(report, out)
+    report["meta"] = {
+        "benchmark": "load_test",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "mongo": "mongomock" if mongo == "mongomock" else "mongodb",
+        "args": vars(args),
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}", file=out)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())